@@ -0,0 +1,185 @@
+import os
+import queue
+import threading
+import time
+
+from telemetry import registry
+
+alerts_fired = registry.counter("posture_alerts_total", "Posture alerts played")
+
+
+class NullAudioBackend:
+    """
+    ### Audio backend that plays nothing and records what would have played
+
+    Used when running headless or in tests, where there may be no audio device.
+    """
+
+    def __init__(self) -> None:
+        self.sounds = {}
+        self.played = []
+
+    def init(self) -> None:
+        pass
+
+    def load(self, name: str, path: str) -> None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.sounds[name] = path
+
+    def play(self, name: str, volume: float) -> None:
+        self.played.append((name, volume))
+
+    def quit(self) -> None:
+        pass
+
+
+class PygameAudioBackend:
+    """
+    ### pygame.mixer backend: sounds are decoded once and played on a reserved channel
+
+    pygame is imported in :meth:`init`, so importing this module stays cheap.
+    """
+
+    def __init__(self, channel_id: int = 0) -> None:
+        self.channel_id = channel_id
+        self.sounds = {}
+        self.mixer = None
+        self.channel = None
+
+    def init(self) -> None:
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        from pygame import mixer
+
+        mixer.init()
+        # keep the alert channel out of the pool used by Sound.play()
+        mixer.set_reserved(self.channel_id + 1)
+        self.mixer = mixer
+        self.channel = mixer.Channel(self.channel_id)
+
+    def load(self, name: str, path: str) -> None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.sounds[name] = self.mixer.Sound(path)
+
+    def play(self, name: str, volume: float) -> None:
+        sound = self.sounds[name]
+        sound.set_volume(volume)
+        self.channel.play(sound, fade_ms=10)
+
+    def quit(self) -> None:
+        if self.mixer is not None:
+            self.mixer.quit()
+
+
+class AlertEngine:
+    """
+    ### Non-blocking, rate limited audio alerts
+
+    The audio backend is initialized and every sound decoded once, on a
+    dedicated thread, when the engine starts. :meth:`alert` only checks the
+    rate limit and hands the request to that thread, so firing an alert costs
+    the frame loop nothing. Errors from the audio thread (e.g. a missing sound
+    file) are collected and can be shown with :meth:`pop_error`.
+
+    Args:
+    * backend: audio backend, defaults to :class:`PygameAudioBackend`
+    * min_interval: minimum seconds between two alerts
+    * volume: playback volume 0.0-1.0
+    * clock: monotonic time source, injectable for tests
+
+    Example:
+    `alerts = AlertEngine(min_interval=5)`
+    `alerts.add_sound("buzz", resource_path("buzz-notif.mp3"))`
+    `alerts.start()`
+    `alerts.alert("buzz")`
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        min_interval: float = 5.0,
+        volume: float = 0.2,
+        clock=time.monotonic,
+    ) -> None:
+        self.backend = backend or PygameAudioBackend()
+        self.min_interval = min_interval
+        self.volume = volume
+        self.clock = clock
+        self.sound_paths = {}
+        self.errors = queue.SimpleQueue()
+        self.fired = 0
+        self.ready = threading.Event()
+        self._requests = queue.SimpleQueue()
+        self._last_alert = None
+        self._thread = None
+
+    def add_sound(self, name: str, path: str) -> None:
+        """Register a sound to be decoded when the engine starts."""
+        self.sound_paths[name] = path
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="alerts", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def alert(self, name: str | None = None) -> bool:
+        """
+        ### Request an alert sound, unless one was played less than `min_interval` ago
+
+        Args:
+        * name: a sound registered with :meth:`add_sound`, defaults to the first one
+
+        Returns:
+        * True if the alert was queued for playing
+        """
+        now = self.clock()
+        if self._last_alert is not None and now - self._last_alert < self.min_interval:
+            return False
+        if name is None:
+            name = next(iter(self.sound_paths), None)
+        if name is None:
+            return False
+        self._last_alert = now
+        self.fired += 1
+        alerts_fired.inc()
+        self._requests.put(name)
+        return True
+
+    def pop_error(self) -> Exception | None:
+        """Returns the oldest error raised on the audio thread, or None."""
+        try:
+            return self.errors.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run(self) -> None:
+        try:
+            self.backend.init()
+        except Exception as e:
+            self.errors.put(e)
+            return
+        for name, path in self.sound_paths.items():
+            try:
+                self.backend.load(name, path)
+            except Exception as e:
+                self.errors.put(e)
+        self.ready.set()
+
+        while True:
+            name = self._requests.get()
+            if name is None:
+                break
+            try:
+                self.backend.play(name, self.volume)
+            except KeyError:
+                # the sound failed to load, the error was already reported
+                pass
+            except Exception as e:
+                self.errors.put(e)
+        self.backend.quit()
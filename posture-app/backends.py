@@ -0,0 +1,328 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+from pose_utils import LANDMARK_COUNT, LandmarkBuffer, inference_counter, process_frame
+from frame_pool import RgbBuffer
+
+BACKENDS = ("legacy", "tasks", "onnx")
+# options of the tasks backend
+RUNNING_MODES = ("video", "live_stream")
+DELEGATES = ("cpu", "gpu")
+
+
+class PoseBackend(ABC):
+    """
+    ### Pose inference behind a common interface
+
+    Every backend takes a BGR frame and returns the (33, 4) float32 array of
+    normalized x, y, z, visibility per landmark that :class:`LandmarkBuffer`
+    produces, so the rest of the engine does not care which model ran. The
+    returned array is reused by the next call; copy it before handing it to
+    another thread.
+
+    Example:
+    `backend = create_backend("onnx", model_path="pose_landmark_lite.onnx", threads=2)`
+    `landmarks = backend.detect(image, time.monotonic())`
+    `backend.close()`
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def detect(self, image: np.ndarray, timestamp: float | None = None):
+        """
+        ### Run pose inference on one frame
+
+        Args:
+        * image: BGR frame, it is not modified
+        * timestamp: capture time in seconds, must increase between calls
+
+        Returns:
+        * the (33, 4) landmark array, None if no pose was detected
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class LegacyBackend(PoseBackend):
+    """
+    ### `mp.solutions.pose.Pose`, the original (and slowest) MediaPipe API
+
+    Args:
+    * model_complexity: 0, 1 or 2
+    * pose: an existing Pose object to wrap instead of creating one
+    """
+
+    name = "legacy"
+
+    def __init__(self, model_complexity: int = 0, pose=None) -> None:
+        if pose is None:
+            import mediapipe as mp
+
+            pose = mp.solutions.pose.Pose(
+                static_image_mode=False, model_complexity=model_complexity
+            )
+        self.pose = pose
+        self.buffer = LandmarkBuffer()
+        self.rgb = RgbBuffer()
+
+    def detect(self, image: np.ndarray, timestamp: float | None = None):
+        results, _ = process_frame(image, self.pose, self.rgb)
+        return self.buffer.fill(results.pose_landmarks)
+
+    def close(self) -> None:
+        self.pose.close()
+
+
+class _Timestamps:
+    """Strictly increasing millisecond timestamps, as the MediaPipe Tasks API requires."""
+
+    def __init__(self) -> None:
+        self.last = -1
+
+    def next(self, timestamp: float | None) -> int:
+        ms = int((time.monotonic() if timestamp is None else timestamp) * 1000)
+        self.last = max(ms, self.last + 1)
+        return self.last
+
+
+class TasksBackend(PoseBackend):
+    """
+    ### MediaPipe Tasks `PoseLandmarker` (requires a `.task` model file)
+
+    VIDEO mode runs inference synchronously with tracking between frames.
+    LIVE_STREAM mode hands frames to MediaPipe's own graph threads and waits
+    for the result of the submitted frame, so the landmarks always belong to
+    the frame (and ROI crop) that was passed in; frames are already dropped
+    upstream by the pipeline's latest-frame queues.
+
+    Args:
+    * model_path: e.g. `pose_landmarker_lite.task` from the MediaPipe model page
+    * running_mode: "video" or "live_stream"
+    * delegate: "cpu" or "gpu"
+    * timeout: seconds to wait for a LIVE_STREAM result before giving up on the frame
+    """
+
+    name = "tasks"
+
+    def __init__(
+        self,
+        model_path: str,
+        running_mode: str = "video",
+        delegate: str = "cpu",
+        timeout: float = 1.0,
+    ) -> None:
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        if running_mode not in RUNNING_MODES:
+            raise ValueError(f"Unknown running mode {running_mode!r}")
+        if delegate not in DELEGATES:
+            raise ValueError(f"Unknown delegate {delegate!r}")
+        self.mp = mp
+        self.live = running_mode == "live_stream"
+        self.timeout = timeout
+        self.buffer = LandmarkBuffer()
+        self.rgb = RgbBuffer()
+        self.timestamps = _Timestamps()
+        self._done = threading.Event()
+        self._result = None
+        self._waiting_for = None
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(
+                model_asset_path=model_path,
+                delegate=getattr(BaseOptions.Delegate, delegate.upper()),
+            ),
+            running_mode=(
+                vision.RunningMode.LIVE_STREAM
+                if self.live
+                else vision.RunningMode.VIDEO
+            ),
+            num_poses=1,
+            result_callback=self._on_result if self.live else None,
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    def _on_result(self, result, image, timestamp_ms: int) -> None:
+        # results of frames that timed out are ignored
+        if timestamp_ms == self._waiting_for:
+            self._result = result
+            self._done.set()
+
+    def detect(self, image: np.ndarray, timestamp: float | None = None):
+        rgb = self.rgb.convert(image)
+        inference_counter.count_conversion()
+        # mp.Image copies the pixels, the RGB buffer can be reused right away
+        frame = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=rgb)
+        timestamp_ms = self.timestamps.next(timestamp)
+        if self.live:
+            self._done.clear()
+            self._result = None
+            self._waiting_for = timestamp_ms
+            self.landmarker.detect_async(frame, timestamp_ms)
+            result = self._result if self._done.wait(self.timeout) else None
+        else:
+            result = self.landmarker.detect_for_video(frame, timestamp_ms)
+        inference_counter.count_inference()
+        if result is None or not result.pose_landmarks:
+            return None
+        self.buffer.array[:] = [
+            (lm.x, lm.y, lm.z, lm.visibility or 0.0) for lm in result.pose_landmarks[0]
+        ]
+        return self.buffer.array
+
+    def close(self) -> None:
+        self.landmarker.close()
+
+
+class OnnxBackend(PoseBackend):
+    """
+    ### BlazePose landmark model on ONNX Runtime's CPU provider
+
+    Expects an ONNX conversion of the MediaPipe pose landmark model (e.g.
+    `pose_landmark_lite.onnx`): one square RGB input in [0, 1], NHWC or NCHW,
+    a (1, 195) output of 39 x (x, y, z, visibility, presence) in input pixels
+    and a (1, 1) pose presence score. There is no person detector stage, the
+    whole frame (or the :class:`roi.RoiTracker` crop) is letterboxed into the
+    input, which works for a single person at a desk.
+
+    Args:
+    * model_path: the .onnx file
+    * threads: intra-op threads, 0 lets ONNX Runtime use every core
+    * min_presence: pose presence score below which no pose is reported
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self, model_path: str, threads: int = 0, min_presence: float = 0.5
+    ) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        # a single model runs per frame, no parallelism between graph nodes to exploit
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.channels_last = model_input.shape[-1] == 3
+        size = model_input.shape[1] if self.channels_last else model_input.shape[2]
+        self.size = size if isinstance(size, int) else 256
+        self.min_presence = min_presence
+        self.buffer = LandmarkBuffer()
+        # letterboxed frame, its RGB conversion and the float input, reused every frame
+        self._canvas = np.zeros((self.size, self.size, 3), dtype=np.uint8)
+        self._rgb = RgbBuffer()
+        self._resized = None
+        self._input = np.zeros((1, self.size, self.size, 3), dtype=np.float32)
+
+    def _letterbox(self, image: np.ndarray) -> tuple[np.ndarray, float, int, int]:
+        """Fit the frame into the square input, returns (input, scale, pad_x, pad_y)."""
+        height, width = image.shape[:2]
+        scale = self.size / max(height, width)
+        resized_w, resized_h = round(width * scale), round(height * scale)
+        pad_x, pad_y = (self.size - resized_w) // 2, (self.size - resized_h) // 2
+        if self._resized is None or self._resized.shape[1::-1] != (
+            resized_w,
+            resized_h,
+        ):
+            # the frame or ROI crop changed size, the borders have to be cleared
+            self._resized = None
+            self._canvas[:] = 0
+        self._resized = cv2.resize(
+            image,
+            (resized_w, resized_h),
+            dst=self._resized,
+            interpolation=cv2.INTER_AREA,
+        )
+        self._canvas[pad_y : pad_y + resized_h, pad_x : pad_x + resized_w] = (
+            self._resized
+        )
+        rgb = self._rgb.convert(self._canvas)
+        inference_counter.count_conversion()
+        np.multiply(rgb, 1 / 255, out=self._input[0], casting="unsafe")
+        tensor = self._input
+        if not self.channels_last:
+            tensor = np.ascontiguousarray(tensor.transpose(0, 3, 1, 2))
+        return tensor, scale, pad_x, pad_y
+
+    def detect(self, image: np.ndarray, timestamp: float | None = None):
+        height, width = image.shape[:2]
+        tensor, scale, pad_x, pad_y = self._letterbox(image)
+        outputs = self.session.run(None, {self.input_name: tensor})
+        inference_counter.count_inference()
+        presence = next((out for out in outputs if out.size == 1), None)
+        if presence is not None and float(presence.ravel()[0]) < self.min_presence:
+            return None
+        raw = next(out for out in outputs if out.size in (165, 195))
+        points = raw.reshape(-1, 5)[:LANDMARK_COUNT]
+        array = self.buffer.array
+        array[:, 0] = (points[:, 0] - pad_x) / (width * scale)
+        array[:, 1] = (points[:, 1] - pad_y) / (height * scale)
+        # mediapipe's z is on the same scale as x
+        array[:, 2] = points[:, 2] / (width * scale)
+        # visibility is a logit in the raw model output
+        array[:, 3] = 1 / (1 + np.exp(-points[:, 3]))
+        return array
+
+
+def as_backend(pose) -> PoseBackend:
+    """Wraps a legacy `mp.solutions.pose.Pose` object, backends are returned as is."""
+    if isinstance(pose, PoseBackend):
+        return pose
+    return LegacyBackend(pose=pose)
+
+
+def create_backend(
+    name: str = "legacy",
+    model_path: str | None = None,
+    model_complexity: int = 0,
+    threads: int = 0,
+    running_mode: str = "video",
+    delegate: str = "cpu",
+) -> PoseBackend:
+    """
+    ### Create a pose backend by name
+
+    Args:
+    * name: one of :data:`BACKENDS`
+    * model_path: model file, required by "tasks" (.task) and "onnx" (.onnx)
+    * model_complexity: legacy backend only
+    * threads: ONNX Runtime intra-op threads, 0 for all cores
+    * running_mode: one of :data:`RUNNING_MODES`, tasks backend only
+    * delegate: one of :data:`DELEGATES`, tasks backend only
+
+    Raises:
+    * ValueError: unknown backend, running mode or delegate, or missing model path
+    * ImportError: the backend's package (mediapipe, onnxruntime) is not installed
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pose backend {name!r}, expected one of {BACKENDS}")
+    if name == "legacy":
+        return LegacyBackend(model_complexity)
+    if not model_path:
+        raise ValueError(f"The {name} pose backend needs a model file")
+    if name == "tasks":
+        try:
+            return TasksBackend(model_path, running_mode, delegate)
+        except ImportError as e:
+            raise ImportError(
+                "The tasks pose backend requires mediapipe with the Tasks API "
+                "(pip install -U mediapipe)"
+            ) from e
+    try:
+        return OnnxBackend(model_path, threads)
+    except ImportError as e:
+        raise ImportError(
+            "The onnx pose backend requires onnxruntime (pip install onnxruntime)"
+        ) from e
@@ -0,0 +1,388 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from headless import run
+from backends import BACKENDS, DELEGATES, RUNNING_MODES, create_backend
+from sources import VideoFileSource
+
+# Suppresses a near-dated mediapipe dependency
+warnings.filterwarnings("ignore", category=UserWarning, module="google.protobuf")
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+RESULT_FIELDS = (
+    "file",
+    "frames",
+    "detected",
+    "good_frames",
+    "good_seconds",
+    "bad_seconds",
+    "standing_seconds",
+    "good_ratio",
+    "alerts",
+    "duration_seconds",
+    "processing_seconds",
+    "error",
+)
+
+# the pose backend of the current worker process, created once by _init_worker
+_pose = None
+
+
+class _EventCounter:
+    """Writer for :func:`headless.run` that only counts events by name."""
+
+    def __init__(self) -> None:
+        self.counts = {}
+
+    def write(self, record: dict) -> None:
+        if record["type"] == "event":
+            self.counts[record["event"]] = self.counts.get(record["event"], 0) + 1
+
+
+def _init_worker(
+    backend: str,
+    model_path: str | None,
+    threads: int,
+    model_complexity: int,
+    running_mode: str = "video",
+    delegate: str = "cpu",
+) -> None:
+    global _pose
+    _pose = create_backend(
+        backend,
+        model_path,
+        model_complexity=model_complexity,
+        threads=threads,
+        running_mode=running_mode,
+        delegate=delegate,
+    )
+
+
+def analyze_file(path: str, baseline: dict | None = None, easiness: int = 5) -> dict:
+    """
+    ### Score every frame of one video file with the worker's pose backend
+
+    Runs the same engine as :mod:`headless` (ROI, smoothing, standing,
+    metrics, scoring, timing on the file's own clock).
+
+    Returns:
+    * a result row with the fields in :data:`RESULT_FIELDS`
+    """
+    started = time.perf_counter()
+    row = dict.fromkeys(RESULT_FIELDS)
+    row["file"] = path
+    try:
+        events = _EventCounter()
+        summary = run(
+            VideoFileSource(path),
+            events,
+            pose=_pose,
+            baseline=baseline,
+            easiness=easiness,
+            summary_every=0,
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        row["processing_seconds"] = round(time.perf_counter() - started, 3)
+        return row
+    scored = summary["good_seconds"] + summary["bad_seconds"]
+    row.update(
+        frames=summary["frames"],
+        detected=summary["detected"],
+        good_frames=summary["good_frames"],
+        good_seconds=summary["good_seconds"],
+        bad_seconds=summary["bad_seconds"],
+        standing_seconds=summary["standing_seconds"],
+        good_ratio=round(summary["good_seconds"] / scored, 4) if scored else None,
+        alerts=events.counts.get("alert", 0),
+        duration_seconds=summary["t"],
+    )
+    row["processing_seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+class Manifest:
+    """
+    ### Record of the files that were analyzed, used to resume an interrupted run
+
+    One JSON line per finished file with its size and mtime, so a file that
+    changed since it was analyzed is analyzed again. Failures are recorded in
+    :attr:`failed` only, not in the results, and retried on the next run; a
+    later success replaces the failure.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.rows = {}
+        self.failed = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # a line cut off by the interruption
+                        continue
+                    if entry["row"].get("error"):
+                        self.failed[entry["key"]] = entry["row"]
+                    else:
+                        self.failed.pop(entry["key"], None)
+                        self.rows[entry["key"]] = entry["row"]
+        self.file = open(path, "a")
+
+    @staticmethod
+    def key(path: str) -> str:
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def done(self, path: str) -> bool:
+        try:
+            return self.key(path) in self.rows
+        except OSError:
+            # missing files are reported as errors by the workers
+            return False
+
+    def add(self, path: str, row: dict) -> None:
+        """Record a result, successful or failed (a row with an `error`)."""
+        try:
+            key = self.key(path)
+        except OSError:
+            # e.g. the file is missing, there is no size or mtime to record
+            key = os.path.abspath(path)
+        if row.get("error"):
+            self.failed[key] = row
+        else:
+            self.failed.pop(key, None)
+            self.rows[key] = row
+        self.file.write(json.dumps({"key": key, "row": row}) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ResultWriter:
+    """
+    ### Streams result rows to JSONL or CSV, or collects them for Parquet
+
+    JSONL and CSV are appended to, so a resumed run continues the same file.
+    Parquet (requires pyarrow) is written when the writer is closed.
+    """
+
+    def __init__(self, path: str | None) -> None:
+        self.path = path
+        self.format = _output_format(path)
+        self.rows = []
+        self.csv = None
+        if self.format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SystemExit(
+                    "Parquet output requires pyarrow (pip install pyarrow)"
+                )
+            self.file = None
+        elif path:
+            exists = os.path.exists(path) and os.path.getsize(path) > 0
+            self.file = open(path, "a", newline="")
+            if self.format == "csv":
+                self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+                if not exists:
+                    self.csv.writeheader()
+        else:
+            self.file = sys.stdout
+
+    def write(self, row: dict) -> None:
+        if self.format == "parquet":
+            self.rows.append(row)
+        elif self.csv is not None:
+            self.csv.writerow(row)
+            self.file.flush()
+        else:
+            self.file.write(json.dumps(row) + "\n")
+            self.file.flush()
+
+    def close(self, rows: list[dict] | None = None) -> None:
+        """Finish the output; Parquet is written from `rows` (all results so far) if given."""
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(rows if rows is not None else self.rows)
+            pq.write_table(table, self.path)
+        elif self.file is not sys.stdout:
+            self.file.close()
+
+
+def _output_format(path: str | None) -> str:
+    if path and path.endswith(".parquet"):
+        return "parquet"
+    if path and path.endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def find_videos(paths: list[str]) -> list[str]:
+    """Expands directories (recursively) into the video files they contain."""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                videos += [
+                    os.path.join(root, name)
+                    for name in names
+                    if name.lower().endswith(VIDEO_EXTENSIONS)
+                ]
+        else:
+            videos.append(path)
+    return sorted(videos)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyze recorded videos for posture, one pose backend per worker process"
+    )
+    parser.add_argument("inputs", nargs="+", help="video files or directories")
+    parser.add_argument(
+        "--output",
+        help="results file, .jsonl, .csv or .parquet (needs pyarrow), defaults to stdout",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="resume manifest, defaults to OUTPUT.manifest (no resuming without --output)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2)
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="legacy")
+    parser.add_argument(
+        "--model", help="model file of the tasks (.task) or onnx (.onnx) backend"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="onnx backend intra-op threads per worker, 0 for all cores",
+    )
+    parser.add_argument(
+        "--running-mode",
+        choices=RUNNING_MODES,
+        default="video",
+        help="tasks backend running mode",
+    )
+    parser.add_argument(
+        "--delegate", choices=DELEGATES, default="cpu", help="tasks backend delegate"
+    )
+    parser.add_argument("--model-complexity", type=int, default=0, choices=[0, 1, 2])
+    parser.add_argument("--easiness", type=int, default=5)
+    parser.add_argument(
+        "--baseline", help="JSON object of baseline values, e.g. '{\"closeness\": 400}'"
+    )
+    args = parser.parse_args(argv)
+    if args.backend != "legacy" and not args.model:
+        parser.error(f"--backend {args.backend} requires --model")
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline)
+        except ValueError as e:
+            parser.error(f"--baseline is not valid JSON: {e}")
+        if not isinstance(baseline, dict):
+            parser.error("--baseline must be a JSON object")
+    # fail before starting the pool: a worker whose backend cannot be created
+    # would break the whole pool
+    try:
+        create_backend(
+            args.backend,
+            args.model,
+            model_complexity=args.model_complexity,
+            threads=args.threads,
+            running_mode=args.running_mode,
+            delegate=args.delegate,
+        ).close()
+    except (ImportError, ValueError, RuntimeError, OSError) as e:
+        parser.error(str(e))
+    videos = find_videos(args.inputs)
+    manifest_path = args.manifest or (
+        f"{args.output}.manifest" if args.output else None
+    )
+    manifest = Manifest(manifest_path) if manifest_path else None
+    pending = [path for path in videos if not (manifest and manifest.done(path))]
+    skipped = len(videos) - len(pending)
+    print(
+        f"{len(videos)} videos, {skipped} already analyzed, {len(pending)} to go",
+        file=sys.stderr,
+    )
+
+    writer = ResultWriter(args.output)
+    started = time.monotonic()
+    finished = failed = 0
+    # spawned workers, mediapipe is not safe to use across a fork
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(
+            args.backend,
+            args.model,
+            args.threads,
+            args.model_complexity,
+            args.running_mode,
+            args.delegate,
+        ),
+    )
+    try:
+        futures = {
+            executor.submit(analyze_file, path, baseline, args.easiness): path
+            for path in pending
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            row = future.result()
+            finished += 1
+            if manifest is not None:
+                manifest.add(path, row)
+            # with a manifest failures stay out of the results, a resumed run
+            # retries them and would otherwise append another error row
+            if manifest is None or not row["error"]:
+                writer.write(row)
+            if row["error"]:
+                failed += 1
+                status = row["error"]
+            else:
+                status = f"{row['frames']} frames, {row['good_ratio']} good"
+            elapsed = time.monotonic() - started
+            eta = elapsed / finished * (len(pending) - finished)
+            print(
+                f"[{finished}/{len(pending)}] {path}: {status} (eta {eta:.0f}s)",
+                file=sys.stderr,
+            )
+    except KeyboardInterrupt:
+        print("Interrupted, rerun the same command to resume", file=sys.stderr)
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise SystemExit(130)
+    except BrokenProcessPool as e:
+        raise SystemExit(
+            f"A worker process died ({e}), rerun the same command to resume"
+        )
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        all_rows = list(manifest.rows.values()) if manifest is not None else None
+        writer.close(all_rows)
+        if manifest is not None:
+            manifest.close()
+    print(f"Done, {finished - failed} analyzed, {failed} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import warnings
+
+import cv2
+import numpy as np
+
+from pose_utils import calculate_posture_metrics, LandmarkBuffer
+from backends import BACKENDS, DELEGATES, RUNNING_MODES, PoseBackend, create_backend
+from posture_boolean import is_standing
+from gui_functions import draw_posture_indicators
+from preview import PreviewEncoder
+from sources import SyntheticSource, VideoFileSource
+
+# Suppresses a near-dated mediapipe dependency
+warnings.filterwarnings("ignore", category=UserWarning, module="google.protobuf")
+
+STAGES = (
+    "process_frame",
+    "calculate_posture_metrics",
+    "is_standing",
+    "draw_posture_indicators",
+    "preview_encode",
+)
+
+# stage percentiles compared against a baseline run
+COMPARED_PERCENTILES = ("p50_ms", "p90_ms")
+
+
+class StageTimer:
+    """Collects per-call durations for each named stage."""
+
+    def __init__(self) -> None:
+        self.samples = {}
+
+    def time(self, stage: str, func, *args):
+        start = time.perf_counter_ns()
+        result = func(*args)
+        self.samples.setdefault(stage, []).append(time.perf_counter_ns() - start)
+        return result
+
+    def report(self) -> dict:
+        report = {}
+        for stage in STAGES:
+            samples = self.samples.get(stage)
+            if not samples:
+                continue
+            ms = np.array(samples, dtype=np.float64) / 1e6
+            p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+            report[stage] = {
+                "calls": len(ms),
+                "mean_ms": round(float(ms.mean()), 4),
+                "p50_ms": round(float(p50), 4),
+                "p90_ms": round(float(p90), 4),
+                "p99_ms": round(float(p99), 4),
+                "max_ms": round(float(ms.max()), 4),
+                "fps": round(1000 / float(ms.mean()), 1) if ms.mean() else None,
+            }
+        return report
+
+
+def synthetic_frames(frames: int, width: int = 640, height: int = 480, seed: int = 0):
+    """
+    Yields (image, synthetic pose_landmarks) pairs. The image is noise, so the
+    landmarks stand in for the pose mediapipe would have detected.
+    """
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    source = SyntheticSource(frames=frames, width=width, height=height, seed=seed)
+    for frame in source:
+        yield image.copy(), frame.pose_landmarks
+
+
+def video_frames(path: str, frames: int):
+    for i, frame in enumerate(VideoFileSource(path)):
+        if frames and i >= frames:
+            return
+        yield frame.image, None
+
+
+def run_benchmark(
+    frames,
+    backend: PoseBackend | None = None,
+    preview: PreviewEncoder | None = None,
+    warmup: int = 10,
+) -> dict:
+    """
+    ### Time each stage of the pose -> metrics -> scoring -> render hot path
+
+    Args:
+    * frames: iterable of (image, fallback_pose_landmarks); the fallback is used
+      when inference is skipped or finds no pose, so every stage is exercised
+    * backend: pose backend timed as the `process_frame` stage, None skips it
+    * preview: encoder used for the preview stage, defaults to the GUI's settings
+    * warmup: frames run before timing starts
+
+    Returns:
+    * dict with per-stage percentiles and overall frames/sec
+    """
+    preview = preview or PreviewEncoder(max_fps=0)
+    timer = StageTimer()
+    buffer = LandmarkBuffer()
+    count = 0
+    start = None
+
+    for i, (image, fallback_landmarks) in enumerate(frames):
+        if i == warmup:
+            timer = StageTimer()
+            start = time.perf_counter()
+        landmarks = None
+        if backend is not None:
+            # frames are timestamped 0.1s apart, as from a 10 fps camera
+            landmarks = timer.time("process_frame", backend.detect, image, i / 10)
+        if landmarks is None:
+            landmarks = buffer.fill(fallback_landmarks)
+        if landmarks is None:
+            continue
+
+        height, width = image.shape[:2]
+        timer.time("is_standing", is_standing, landmarks)
+        try:
+            metrics = timer.time(
+                "calculate_posture_metrics",
+                calculate_posture_metrics,
+                landmarks,
+                width,
+                height,
+            )
+        except (ValueError, ZeroDivisionError):
+            # degenerate landmarks, skipped like the app skips the frame
+            continue
+        timer.time(
+            "draw_posture_indicators",
+            draw_posture_indicators,
+            image,
+            metrics.l_shldr_x,
+            metrics.l_shldr_y,
+            metrics.r_shldr_x,
+            metrics.r_shldr_y,
+            metrics.l_ear_x,
+            metrics.l_ear_y,
+            metrics.l_hip_x,
+            metrics.l_hip_y,
+            (127, 233, 100),
+        )
+        timer.time("preview_encode", preview.encode, image)
+        if i >= warmup:
+            count += 1
+
+    elapsed = time.perf_counter() - start if start else 0.0
+    return {
+        "frames": count,
+        "pipeline_fps": round(count / elapsed, 1) if elapsed else None,
+        "stages": timer.report(),
+    }
+
+
+def median_of_runs(runs: list[dict]) -> dict:
+    """
+    ### Combine repeated :func:`run_benchmark` results into one
+
+    Every stage statistic (and the pipeline fps) is the median over the runs,
+    so one run disturbed by the scheduler does not move the result.
+    """
+    stages = {}
+    for stage in STAGES:
+        reports = [run["stages"][stage] for run in runs if stage in run["stages"]]
+        if not reports:
+            continue
+        stages[stage] = {
+            key: (
+                None
+                if any(report[key] is None for report in reports)
+                else round(float(np.median([report[key] for report in reports])), 4)
+            )
+            for key in reports[0]
+        }
+        stages[stage]["calls"] = int(stages[stage]["calls"])
+    fps = [run["pipeline_fps"] for run in runs if run["pipeline_fps"]]
+    return {
+        "frames": int(np.median([run["frames"] for run in runs])),
+        "runs": len(runs),
+        "pipeline_fps": round(float(np.median(fps)), 1) if fps else None,
+        "stages": stages,
+    }
+
+
+def compare(
+    result: dict,
+    baseline: dict,
+    threshold: float,
+    min_delta_ms: float = 0.005,
+    noise: float = 0.5,
+) -> list[str]:
+    """
+    ### Flag stages that got slower than the baseline run
+
+    A stage regresses when a compared percentile is more than `threshold`
+    (fractional) slower and the slowdown is above the stage's noise floor:
+    `noise` times the baseline p50, but at least `min_delta_ms`. The floor
+    scales with the stage, so timer jitter on a 0.5 ms stage is not flagged
+    while an 8 µs stage that got several times slower still is.
+
+    Returns a list of human readable regressions, empty if there are none.
+    """
+    regressions = []
+    for stage, stats in result["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old:
+            continue
+        floor = max(noise * old["p50_ms"], min_delta_ms)
+        for key in COMPARED_PERCENTILES:
+            slower = stats[key] - old[key]
+            if old[key] and stats[key] > old[key] * (1 + threshold) and slower > floor:
+                regressions.append(
+                    f"{stage} {key}: {old[key]:.3f}ms -> {stats[key]:.3f}ms "
+                    f"(+{(stats[key] / old[key] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the posture hot path and compare against a baseline"
+    )
+    parser.add_argument("--video", help="recorded clip to benchmark, default synthetic")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="runs whose per-stage medians are reported and compared",
+    )
+    parser.add_argument("--model-complexity", type=int, default=0, choices=[0, 1, 2])
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="legacy",
+        help="pose backend, compare backends by running once per backend with --compare",
+    )
+    parser.add_argument(
+        "--model", help="model file of the tasks (.task) or onnx (.onnx) backend"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="onnx backend intra-op threads, 0 for all",
+    )
+    parser.add_argument(
+        "--running-mode",
+        choices=RUNNING_MODES,
+        default="video",
+        help="tasks backend running mode",
+    )
+    parser.add_argument(
+        "--delegate", choices=DELEGATES, default="cpu", help="tasks backend delegate"
+    )
+    parser.add_argument(
+        "--skip-inference",
+        action="store_true",
+        help="do not load mediapipe, benchmark the stages after process_frame only",
+    )
+    parser.add_argument("--preview-format", default="ppm")
+    parser.add_argument("--preview-scale", type=float, default=1.0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="fractional slowdown flagged as a regression (default 0.10 = 10%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.005,
+        help="ignore slowdowns smaller than this many milliseconds",
+    )
+    parser.add_argument(
+        "--noise",
+        type=float,
+        default=0.5,
+        help="ignore slowdowns smaller than this fraction of the stage's baseline p50",
+    )
+    args = parser.parse_args(argv)
+
+    backend = None
+    if not args.skip_inference:
+        try:
+            backend = create_backend(
+                args.backend,
+                args.model,
+                model_complexity=args.model_complexity,
+                threads=args.threads,
+                running_mode=args.running_mode,
+                delegate=args.delegate,
+            )
+        except (ImportError, ValueError, RuntimeError, OSError) as e:
+            parser.error(str(e))
+
+    total = args.frames + args.warmup
+    runs = []
+    for _ in range(max(args.repeat, 1)):
+        if args.video:
+            frames = video_frames(args.video, total)
+        else:
+            frames = synthetic_frames(total)
+        runs.append(
+            run_benchmark(
+                frames,
+                backend=backend,
+                preview=PreviewEncoder(
+                    fmt=args.preview_format, scale=args.preview_scale, max_fps=0
+                ),
+                warmup=args.warmup,
+            )
+        )
+    result = median_of_runs(runs)
+    result["meta"] = {
+        "source": args.video or "synthetic",
+        "backend": None if args.skip_inference else args.backend,
+        "model": args.model,
+        "threads": args.threads,
+        "running_mode": args.running_mode,
+        "delegate": args.delegate,
+        "model_complexity": None if args.skip_inference else args.model_complexity,
+        "preview_format": args.preview_format,
+        "preview_scale": args.preview_scale,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if backend is not None:
+        backend.close()
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(
+            result, baseline, args.threshold, args.min_delta_ms, args.noise
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
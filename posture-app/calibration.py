@@ -0,0 +1,174 @@
+import getpass
+import json
+import os
+import time
+
+import numpy as np
+
+# metrics averaged into the baseline; the spread of the scored ones sets the tolerance bands
+CALIBRATED_METRICS = (
+    "neck_inclination",
+    "torso_inclination",
+    "closeness",
+    "shldr_level",
+    "shldr_distance",
+)
+
+PROFILE_DIR = "profiles"
+
+
+class RunningStats:
+    """
+    ### Streaming mean and variance of a fixed set of values (Welford's algorithm)
+
+    Numerically stable, O(1) memory and time per sample, no samples are kept.
+
+    Example:
+    `stats = RunningStats(3)`
+    `stats.update([1.0, 2.0, 3.0])`
+    `print(stats.mean, stats.std)`
+    """
+
+    def __init__(self, size: int) -> None:
+        self.count = 0
+        self.mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance, zeros until there are two samples."""
+        if self.count < 2:
+            return np.zeros_like(self._m2)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+
+class CalibrationProfile:
+    """
+    ### A user's measured good posture: the mean and spread of each metric
+
+    Example:
+    `profile = CalibrationProfile.load(profile_path())`
+    `evaluator.set_calibration(profile)`
+    """
+
+    def __init__(
+        self,
+        baseline: dict[str, float],
+        spread: dict[str, float],
+        samples: int,
+        created: float | None = None,
+    ) -> None:
+        self.baseline = baseline
+        self.spread = spread
+        self.samples = samples
+        self.created = time.time() if created is None else created
+
+    def to_dict(self) -> dict:
+        return {
+            "baseline": self.baseline,
+            "spread": self.spread,
+            "samples": self.samples,
+            "created": self.created,
+        }
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CalibrationProfile":
+        """Raises OSError if the file is missing, ValueError if it is not a profile."""
+        with open(path) as file:
+            data = json.load(file)
+        try:
+            return cls(
+                {k: float(v) for k, v in data["baseline"].items()},
+                {k: float(v) for k, v in data["spread"].items()},
+                int(data["samples"]),
+                data.get("created"),
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"{path} is not a calibration profile: {e}")
+
+
+def profile_path(user: str | None = None) -> str:
+    """Profile file of `user`, defaults to the logged in user."""
+    return os.path.join(PROFILE_DIR, f"{user or getpass.getuser()}.json")
+
+
+class Calibration:
+    """
+    ### Builds a baseline from `duration` seconds of frames instead of a single snapshot
+
+    Feed it every scored frame's metrics while the user holds a good
+    posture; frames while standing or without a pose should be skipped by the
+    caller. Finishes once `duration` has passed and at least `min_samples`
+    frames were collected.
+
+    Args:
+    * duration: seconds to collect metrics for
+    * min_samples: fewest frames a profile may be built from
+    * clock: monotonic time source, injectable for tests
+
+    Example:
+    `calibration = Calibration(duration=10)`
+    `if calibration.add(metrics): evaluator.set_calibration(calibration.profile())`
+    """
+
+    def __init__(
+        self, duration: float = 10.0, min_samples: int = 30, clock=time.monotonic
+    ) -> None:
+        self.duration = duration
+        self.min_samples = min_samples
+        self.clock = clock
+        self.stats = RunningStats(len(CALIBRATED_METRICS))
+        self.started_at = clock()
+        self._values = np.zeros(len(CALIBRATED_METRICS))
+
+    def add(self, metrics, now: float | None = None) -> bool:
+        """
+        ### Add a frame's metrics
+
+        Returns:
+        * True once the calibration is complete
+        """
+        for i, name in enumerate(CALIBRATED_METRICS):
+            self._values[i] = metrics[name]
+        self.stats.update(self._values)
+        return self.done(now)
+
+    def done(self, now: float | None = None) -> bool:
+        now = self.clock() if now is None else now
+        return (
+            now - self.started_at >= self.duration
+            and self.stats.count >= self.min_samples
+        )
+
+    def progress(self, now: float | None = None) -> float:
+        """0.0 - 1.0, for showing the user how long to hold still."""
+        now = self.clock() if now is None else now
+        return min((now - self.started_at) / self.duration, 1.0)
+
+    def profile(self) -> CalibrationProfile:
+        mean, std = self.stats.mean, self.stats.std
+        return CalibrationProfile(
+            {name: float(mean[i]) for i, name in enumerate(CALIBRATED_METRICS)},
+            {name: float(std[i]) for i, name in enumerate(CALIBRATED_METRICS)},
+            self.stats.count,
+        )
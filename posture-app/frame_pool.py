@@ -0,0 +1,81 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    ### Free list of camera frame buffers, reused instead of allocating a frame per read
+
+    `cap.read(image=buffer)` decodes into an existing array of the right
+    shape, so once the pool holds as many buffers as there are frames in
+    flight (capture, queued, inferred, queued, shown) no frame is allocated
+    anymore. Every buffer has exactly one owner at a time: whoever drops or
+    finishes with a frame releases it back. A buffer of the wrong shape (the
+    camera changed resolution) is replaced by OpenCV and simply not reused.
+
+    Args:
+    * size: most free buffers kept, extra released buffers are left to the GC
+
+    Example:
+    `pool = FramePool()`
+    `success, image = pool.read(cap)`
+    `pool.release(image)`
+    """
+
+    def __init__(self, size: int = 6) -> None:
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self) -> np.ndarray | None:
+        """A free buffer, or None when all of them are in use."""
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, buffer: np.ndarray | None) -> None:
+        if buffer is None:
+            return
+        with self._lock:
+            if len(self._free) < self.size:
+                self._free.append(buffer)
+
+    def read(self, cap) -> tuple[bool, np.ndarray | None]:
+        """`cap.read()` into a pooled buffer; the caller owns the returned frame."""
+        buffer = self.acquire()
+        if buffer is None:
+            success, image = cap.read()
+        else:
+            success, image = cap.read(image=buffer)
+        if not success:
+            self.release(buffer)
+            return False, None
+        if image is buffer:
+            self.reused += 1
+        else:
+            self.allocated += 1
+        return True, image
+
+
+class RgbBuffer:
+    """
+    ### Reused destination of the BGR -> RGB conversion before inference
+
+    The frame itself stays BGR and untouched; only the model input is
+    converted, into the same array every frame (reallocated only when the
+    frame or ROI crop changes size).
+
+    Example:
+    `rgb = RgbBuffer()`
+    `results = pose.process(rgb.convert(image))`
+    """
+
+    def __init__(self) -> None:
+        self.array = None
+
+    def convert(self, image: np.ndarray) -> np.ndarray:
+        self.array = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.array)
+        return self.array
@@ -0,0 +1,147 @@
+import os
+import time
+
+import cv2
+
+from telemetry import registry
+
+cpu_usage = registry.gauge(
+    "posture_cpu_usage_ratio", "Process CPU time as a share of all cores"
+)
+governor_level = registry.gauge(
+    "posture_governor_level", "CPU governor throttle level, 0 is full speed"
+)
+
+# throttle levels, each cheaper than the one before:
+# (OpenCV threads or None for its default, minimum seconds between inferences, preview fps)
+LEVELS = (
+    (None, 0.0, 15),
+    (2, 0.1, 10),
+    (1, 0.2, 8),
+    (1, 0.33, 5),
+    (1, 0.5, 3),
+)
+
+
+class CpuGovernor:
+    """
+    ### Keeps the app's CPU usage within a share of the machine
+
+    Every `interval` seconds the process CPU time (all threads, including
+    MediaPipe's and OpenCV's native ones) is compared to the wall time of all
+    cores. Above `budget` the governor steps down one of :data:`LEVELS`
+    (fewer OpenCV threads, a longer minimum inference interval on the
+    :class:`scheduler.AdaptiveScheduler`, a slower preview); below
+    `headroom * budget` it steps back up. One step per sample, so it settles
+    instead of oscillating.
+
+    Args:
+    * budget: target share of all cores, e.g. 0.25 on a 4 core laptop is one core
+    * scheduler: scheduler whose `min_interval` is raised when throttling
+    * preview: :class:`preview.PreviewEncoder` whose `max_fps` is lowered
+    * interval: seconds between usage samples
+    * headroom: fraction of the budget usage has to fall below to speed back up
+    * clock, cpu_clock: wall and process CPU time sources, injectable for tests
+
+    Example:
+    `governor = CpuGovernor(0.25, pipeline.scheduler, preview)`
+    `governor.update()`
+    `print(governor.describe())`
+    """
+
+    def __init__(
+        self,
+        budget: float = 0.25,
+        scheduler=None,
+        preview=None,
+        interval: float = 2.0,
+        headroom: float = 0.7,
+        levels: tuple = LEVELS,
+        clock=time.monotonic,
+        cpu_clock=time.process_time,
+        cpu_count: int | None = None,
+    ) -> None:
+        self.budget = budget
+        self.scheduler = scheduler
+        self.preview = preview
+        self.interval = interval
+        self.headroom = headroom
+        self.levels = levels
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.level = 0
+        self.usage = 0.0
+        self._default_threads = cv2.getNumThreads()
+        self._preview_fps = preview.max_fps if preview is not None else None
+        self._max_interval = scheduler.max_interval if scheduler is not None else None
+        self._sampled_at = clock()
+        self._cpu_at = cpu_clock()
+        self.apply(0)
+
+    def apply(self, level: int) -> None:
+        """Set the OpenCV threads, inference interval and preview rate of `level`."""
+        self.level = max(0, min(level, len(self.levels) - 1))
+        threads, min_interval, preview_fps = self.levels[self.level]
+        cv2.setNumThreads(self._default_threads if threads is None else threads)
+        if self.scheduler is not None:
+            # read by the inference worker, a plain float assignment is atomic
+            self.scheduler.min_interval = min_interval
+            self.scheduler.max_interval = max(self._max_interval, min_interval)
+        if self.preview is not None and self._preview_fps:
+            self.preview.max_fps = min(self._preview_fps, preview_fps)
+        governor_level.set(self.level)
+
+    def update(self, now: float | None = None) -> bool:
+        """
+        ### Sample the CPU usage once `interval` has passed and adjust the level
+
+        Cheap to call every loop iteration.
+
+        Returns:
+        * True if the level changed
+        """
+        now = self.clock() if now is None else now
+        elapsed = now - self._sampled_at
+        if elapsed < self.interval:
+            return False
+        cpu_now = self.cpu_clock()
+        self.usage = (cpu_now - self._cpu_at) / (elapsed * self.cpu_count)
+        self._sampled_at, self._cpu_at = now, cpu_now
+        cpu_usage.set(self.usage)
+        if self.usage > self.budget and self.level < len(self.levels) - 1:
+            self.apply(self.level + 1)
+            return True
+        if self.usage < self.budget * self.headroom and self.level > 0:
+            self.apply(self.level - 1)
+            return True
+        return False
+
+    def describe(self) -> str:
+        return f"{self.usage:.0%} of {self.budget:.0%} (level {self.level})"
+
+
+def lower_priority(increment: int = 5) -> bool:
+    """
+    ### Let other programs go first when the CPU is contended
+
+    Uses `os.nice` on Linux/macOS and psutil (if installed) on Windows.
+
+    Returns:
+    * True if the priority was lowered
+    """
+    if hasattr(os, "nice"):
+        try:
+            os.nice(increment)
+            return True
+        except OSError:
+            return False
+    try:
+        import psutil
+    except ImportError:
+        return False
+    try:
+        psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+    except (psutil.Error, AttributeError):
+        return False
+    return True
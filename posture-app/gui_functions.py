@@ -1,7 +1,6 @@
 import cv2
-from pygame import mixer
 import PySimpleGUI as sg
-import time
+from pomodoro import PomodoroTimer
 import os
 import sys
 
@@ -67,156 +66,81 @@ def resource_path(relative_path):
     
     return os.path.join(base_path,relative_path)
 
-def alert_user():
-    """ gets the relative file of the notifcation buzz and loads and plays track.
-    see :func:`resourec_path()` on how the relative file pathing works """
-    try:
-        mixer.init()
-        audio_file = resource_path("buzz-notif.mp3")
-        mixer.music.load(audio_file)
-        mixer.music.set_volume(0.2)
-        mixer.music.play(fade_ms=10)
-    except FileNotFoundError as e:
-        sg.Popup(f"{e}")
-
-
 class Timer:
     """
-    ### Timer class used for pomodoro timer in GUI app
+    ### Pomodoro timer widgets, driven by :class:`pomodoro.PomodoroTimer`
 
-    #### attributes:
-    window, paused_duration(int): static variable used to , pause, running, start_time, remaining_time, curent_time, pomodoro, time_left, pause_start_time, elapsed_time
+    Translates the Start/(Un)Pause/Reset/Next buttons and the standing
+    signal into state machine calls, and shows the remaining time.
 
     #### methods:
 
-    next_timer()
     check_buttons()
     update_timer()
+    timeout_ms()
 
     """
-    def __init__(self, window: sg.Window) -> None:
+
+    def __init__(self, window: sg.Window, state_path: str | None = None) -> None:
         self.window = window
-        self.paused_duration = 0
-        self.pause = False
-        self.running = False
-        self.start_time = 0
-        self.remaining_time = 0
-        self.current_time = 0
-        self.pomodoro = [
-        "Timer",
-        "Short Break",
-        "Timer",
-        "Short Break",
-        "Timer",
-        "Long Break",
-        "Done",
-        ]
-        self.time_left = 0
-        self.pause_start_time=0
-        self.elapsed_time = 0
-
-    def __format_time(self, seconds:int) -> str:
-        return time.strftime("%H:%M:%S", time.gmtime(seconds))
-
-    def __reset_pomodoro(self) -> list:
-        return [
-            "Timer",
-            "Short Break",
-            "Timer",
-            "Short Break",
-            "Timer",
-            "Long Break",
-            "Done",
-        ]
-
-    def next_timer(self, values):
-        timer_type = self.pomodoro.pop(0)
-        if timer_type is not None:
-            self.remaining_time = self.__get_remaining_time(
-                values, timer_type
-            )  # pop's which timer type is next
-            self.paused_duration = 0
-            self.start_time = time.time()
-            self.running = True
-
-    def check_buttons(self, values, event: str, auto_next=False, auto_start=False):
+        self.pomodoro = PomodoroTimer(state_path=state_path)
+        # combo values the durations were last parsed from
+        self.__parsed = None
+
+    def __set_durations(self, values, notify: bool = True) -> bool:
+        combos = tuple(
+            values.get(key) for key in ("-TIMER-", "-SHORTBREAK-", "-LONGBREAK-")
+        )
+        if combos == self.__parsed:
+            return True
         try:
-            if auto_start and self.pomodoro[0] == "Timer" and not self.running:
-                self.next_timer(values)
-            if (
-                auto_next
-                and not self.running
-                and self.pomodoro[0] == "Short Break"
-                or self.pomodoro[0] == "Long Break"
-            ):
-                self.next_timer(values)
-            if event == "Next":
-                self.next_timer(values)
-        except IndexError:
-            event == "Reset"
+            self.pomodoro.set_durations(*combos)
+        except (ValueError, TypeError) as e:
+            if notify:
+                sg.popup(f"Please select a valid number of minutes \n{e}")
+            return False
+        self.__parsed = combos
+        return True
+
+    def check_buttons(
+        self, values, event: str | None, auto_next=False, auto_start=False
+    ):
+        if event in ("Start", "Next"):
+            if not self.__set_durations(values):
+                return
+        elif auto_next or auto_start:
+            # called every frame; an invalid or half-typed value keeps the
+            # last valid durations instead of opening a popup per frame
+            self.__set_durations(values, notify=False)
+
+        if auto_next:
+            self.pomodoro.on_posture(standing=True)
+        if auto_start:
+            self.pomodoro.on_posture(standing=False)
 
         if event == "Start":
             self.window["-DONE-KEY-"].update("")
-
-            if not self.running:
-                self.start_time = time.time()
-                self.running = True
-                self.remaining_time = self.__get_remaining_time( # pop's which timer type is next
-                    values, self.pomodoro.pop(0)
-                )  
-
-        if event == "(Un)Pause":
-            self.pause = not self.pause
-            if self.running and self.pause:
-                self.pause_start_time = time.time()
-                self.running = False
-            elif not self.running and not self.pause:
-                self.paused_duration += time.time() - self.pause_start_time
-                self.running = True
-
-        if event == "Reset":
-            self.running = False
-            self.remaining_time = 0
-            self.pomodoro = self.__reset_pomodoro()
-            self.window["-DISPLAYTIMER-"].update(
-                self.__format_time(self.remaining_time)
-            )
-            self.paused_duration = 0
-            self.pause = False
-            self.start_time = 0
-            self.elapsed_time = 0
-            self.pause_start_time = 0
-            self.time_left = 0
-
-    def __get_remaining_time(self, values, timer_type) -> int:
-        try:
-            if timer_type == "Timer":
-                return int(values["-TIMER-"]) * 60
-            elif timer_type == "Short Break":
-                return int(values["-SHORTBREAK-"]) * 60
-            elif timer_type == "Long Break":
-                return int(values["-LONGBREAK-"]) * 60
-            elif timer_type == "Done":
-                self.window["-DONE-KEY-"].update("You completed a work cycle!")
-                return -1
-
-        except ValueError as e:
-            sg.popup(f"Please select a valid number of minutes \n{e}")
+            self.pomodoro.start()
+        elif event == "Next":
+            self.pomodoro.advance()
+        elif event == "(Un)Pause":
+            self.pomodoro.toggle_pause()
+        elif event == "Reset":
+            self.pomodoro.reset()
+            self.window["-DONE-KEY-"].update("")
 
     def update_timer(self):
-        if self.running:
-            try:
-                self.elapsed_time = (
-                    time.time() - self.start_time - self.paused_duration
-                )
-                self.time_left = self.remaining_time - self.elapsed_time
-            except TypeError as e:
-                sg.Popup(f"type error: {e}")
-
-        if self.time_left <= 0:
-            self.running = False
-            self.time_left = 0
-        self.window["-DISPLAYTIMER-"].update(self.__format_time(self.time_left))
+        self.pomodoro.tick()
+        if self.pomodoro.done:
+            self.window["-DONE-KEY-"].update("You completed a work cycle!")
+        self.window["-DISPLAYTIMER-"].update(self.pomodoro.display())
+
+    def timeout_ms(self, default: int) -> int:
+        """Milliseconds the GUI loop may wait before the timer display changes."""
+        seconds = self.pomodoro.seconds_until_change()
+        if seconds is None:
+            return default
+        return max(1, min(default, int(seconds * 1000) + 1))
 
 
 def main():
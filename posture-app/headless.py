@@ -0,0 +1,302 @@
+import argparse
+import json
+import sys
+import time
+import warnings
+
+from pose_utils import calculate_posture_metrics, LandmarkBuffer
+from backends import BACKENDS, DELEGATES, RUNNING_MODES, as_backend, create_backend
+from posture_boolean import is_standing
+from roi import RoiTracker
+from landmark_filter import LandmarkFilter
+from posture_evaluator import PostureEvaluator
+from calibration import CalibrationProfile
+from sources import open_source
+from session_recorder import SessionRecorder
+from posture_clock import (
+    PostureClock,
+    RateMeter,
+    good_seconds,
+    bad_seconds,
+    standing_seconds,
+)
+from pipeline import frames_processed, inference_seconds
+from alerts import alerts_fired
+from telemetry import registry, MetricsServer
+
+# Suppresses a near-dated mediapipe dependency
+warnings.filterwarnings("ignore", category=UserWarning, module="google.protobuf")
+
+POSTURE_WARNING_TIME = 5
+ALERT_INTERVAL = 5
+
+
+class JsonlWriter:
+    """Writes one JSON record per line to a file or stdout."""
+
+    def __init__(self, path: str | None) -> None:
+        self.file = open(path, "w") if path else sys.stdout
+
+    def write(self, record: dict) -> None:
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        self.file.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def run(
+    source,
+    writer: JsonlWriter,
+    pose=None,
+    baseline: dict | None = None,
+    easiness: int = 5,
+    frame_records: bool = False,
+    summary_every: float = 10.0,
+    recorder: SessionRecorder | None = None,
+    profile: CalibrationProfile | None = None,
+) -> dict:
+    """
+    ### Run the posture engine over a frame source without a GUI
+
+    Emits `event` records (posture good/bad, standing/sitting, alert) and
+    periodic `summary` records to `writer`, plus a `frame` record per frame
+    when `frame_records` is set.
+
+    Args:
+    * source: any source from :mod:`sources`
+    * writer: :class:`JsonlWriter`
+    * pose: :class:`backends.PoseBackend` (or a legacy mediapipe Pose), only required for sources that yield images
+    * baseline: good posture values, defaults to `posture_boolean.DEFAULT_BASELINE`
+    * easiness: posture easiness 0-10
+    * recorder: optional :class:`session_recorder.SessionRecorder` every frame is logged to
+    * profile: optional :class:`calibration.CalibrationProfile`, replaces `baseline`
+
+    Returns:
+    * the final summary record
+    """
+    evaluator = PostureEvaluator(baseline, easiness)
+    if profile is not None:
+        evaluator.set_calibration(profile)
+    # timed on the source's own clock so video files run faster than real time
+    clock = PostureClock()
+    source_rate = RateMeter()
+    frames = detected = good_frames = 0
+    good_posture = standing = None
+    last_alert_time = None
+    last_timestamp = last_summary = 0.0
+    wall_start = time.perf_counter()
+
+    def summary(timestamp: float) -> dict:
+        elapsed = time.perf_counter() - wall_start
+        good_seconds.set(clock.good_seconds)
+        bad_seconds.set(clock.bad_seconds)
+        standing_seconds.set(clock.standing_seconds)
+        return {
+            "type": "summary",
+            "t": round(timestamp, 3),
+            "frames": frames,
+            "detected": detected,
+            "good_frames": good_frames,
+            "good_seconds": round(clock.good_seconds, 3),
+            "bad_seconds": round(clock.bad_seconds, 3),
+            "standing_seconds": round(clock.standing_seconds, 3),
+            "source_fps": round(source_rate.fps, 2),
+            "processing_fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        }
+
+    def event(timestamp: float, name: str, **extra) -> None:
+        writer.write(
+            {"type": "event", "t": round(timestamp, 3), "event": name, **extra}
+        )
+
+    backend = as_backend(pose) if pose is not None else None
+    buffer = LandmarkBuffer()
+    roi = RoiTracker()
+    smoother = LandmarkFilter()
+
+    for timestamp, image, pose_landmarks in source:
+        box = None
+        if image is not None:
+            crop, box = roi.crop(image)
+            start = time.perf_counter()
+            landmarks = backend.detect(crop, timestamp)
+            inference_seconds.observe(time.perf_counter() - start)
+            height, width = image.shape[:2]
+        else:
+            landmarks = buffer.fill(pose_landmarks)
+            width, height = source.width, source.height
+
+        frames += 1
+        frames_processed.inc()
+        source_rate.tick(timestamp)
+        last_timestamp = timestamp
+
+        landmarks = roi.to_full_frame(landmarks, box, width, height)
+        landmarks = smoother.apply(landmarks, timestamp)
+        now_standing = is_standing(landmarks)
+        if image is not None:
+            roi.update(landmarks, now_standing)
+        if now_standing != standing:
+            standing = now_standing
+            # posture is only scored while sitting, start a fresh streak when sitting back down
+            good_posture = None
+            event(timestamp, "standing" if standing else "sitting")
+
+        try:
+            metrics = calculate_posture_metrics(landmarks, width, height)
+        except (ValueError, ZeroDivisionError):
+            # degenerate landmarks (e.g. a shoulder on the frame edge), skip the frame
+            metrics = None
+        if recorder is not None:
+            recorder.record(timestamp, landmarks, metrics, standing)
+        if not metrics or standing:
+            clock.update(None, standing, timestamp)
+        else:
+            detected += 1
+            score = evaluator.update(metrics)
+            good = score.good
+            clock.update(good, standing, timestamp)
+            if good != good_posture:
+                good_posture = good
+                event(timestamp, "posture_good" if good else "posture_bad")
+            if good:
+                good_frames += 1
+            elif clock.bad_time > POSTURE_WARNING_TIME and (
+                last_alert_time is None or timestamp - last_alert_time > ALERT_INTERVAL
+            ):
+                last_alert_time = timestamp
+                alerts_fired.inc()
+                event(timestamp, "alert", bad_seconds=round(clock.bad_time, 3))
+            if frame_records:
+                writer.write(
+                    {
+                        "type": "frame",
+                        "t": round(timestamp, 3),
+                        "good": good,
+                        "good_closeness": score.good_closeness,
+                        "good_neck": score.good_neck,
+                        "good_shldr_level": score.good_shldr_level,
+                        **{k: float(v) for k, v in metrics.as_dict().items()},
+                    }
+                )
+
+        if summary_every and timestamp - last_summary >= summary_every:
+            last_summary = timestamp
+            writer.write(summary(timestamp))
+
+    final = summary(last_timestamp)
+    writer.write(final)
+    return final
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run posture detection without a GUI and emit JSONL events"
+    )
+    parser.add_argument(
+        "--source",
+        choices=["webcam", "video", "images", "synthetic"],
+        default="synthetic",
+    )
+    parser.add_argument(
+        "--input", help="camera index, video file or image directory for --source"
+    )
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument(
+        "--frames", type=int, default=600, help="synthetic frames, 0 runs forever"
+    )
+    parser.add_argument("--output", help="JSONL output file, defaults to stdout")
+    parser.add_argument("--easiness", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default="legacy")
+    parser.add_argument(
+        "--model", help="model file of the tasks (.task) or onnx (.onnx) backend"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="onnx backend intra-op threads, 0 for all",
+    )
+    parser.add_argument(
+        "--running-mode",
+        choices=RUNNING_MODES,
+        default="video",
+        help="tasks backend running mode",
+    )
+    parser.add_argument(
+        "--delegate", choices=DELEGATES, default="cpu", help="tasks backend delegate"
+    )
+    parser.add_argument(
+        "--frame-records", action="store_true", help="emit a record for every frame"
+    )
+    parser.add_argument(
+        "--profile", help="calibration profile JSON, as saved by the GUI in profiles/"
+    )
+    parser.add_argument("--summary-every", type=float, default=10.0)
+    parser.add_argument("--record", help="also write a binary session log to this file")
+    parser.add_argument(
+        "--metrics-port", type=int, help="serve Prometheus metrics on 127.0.0.1:PORT"
+    )
+    parser.add_argument("--metrics-file", help="write Prometheus metrics to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        profile = CalibrationProfile.load(args.profile) if args.profile else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    try:
+        source = open_source(
+            args.source, args.input, fps=args.fps, frames=args.frames or None
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    pose = None
+    if args.source != "synthetic":
+        try:
+            pose = create_backend(
+                args.backend,
+                args.model,
+                threads=args.threads,
+                running_mode=args.running_mode,
+                delegate=args.delegate,
+            )
+        except (ImportError, ValueError, RuntimeError, OSError) as e:
+            parser.error(str(e))
+
+    writer = JsonlWriter(args.output)
+    recorder = SessionRecorder(args.record) if args.record else None
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(registry, port=args.metrics_port)
+        metrics_server.start()
+    try:
+        run(
+            source,
+            writer,
+            pose=pose,
+            easiness=args.easiness,
+            frame_records=args.frame_records,
+            summary_every=args.summary_every,
+            recorder=recorder,
+            profile=profile,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+        if recorder is not None:
+            recorder.close()
+        if pose is not None:
+            pose.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if args.metrics_file:
+            registry.dump(args.metrics_file)
+
+
+if __name__ == "__main__":
+    main()
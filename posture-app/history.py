@@ -0,0 +1,303 @@
+import argparse
+import os
+import sqlite3
+import time
+
+ROLLUP_COLUMNS = (
+    "good_seconds",
+    "bad_seconds",
+    "standing_seconds",
+    "away_seconds",
+    "neck_sum",
+    "torso_sum",
+    "scored",
+    "alerts",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    ts REAL NOT NULL,
+    good INTEGER,
+    standing INTEGER NOT NULL,
+    neck_inclination REAL,
+    torso_inclination REAL
+);
+CREATE INDEX IF NOT EXISTS frames_ts ON frames (ts);
+{rollups}
+"""
+
+ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    bucket INTEGER PRIMARY KEY,
+    good_seconds REAL NOT NULL DEFAULT 0,
+    bad_seconds REAL NOT NULL DEFAULT 0,
+    standing_seconds REAL NOT NULL DEFAULT 0,
+    away_seconds REAL NOT NULL DEFAULT 0,
+    neck_sum REAL NOT NULL DEFAULT 0,
+    torso_sum REAL NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    alerts INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# rollup table -> bucket size in seconds
+ROLLUPS = {"rollup_minute": 60, "rollup_hour": 3600}
+
+
+def _upsert(table: str) -> str:
+    columns = ", ".join(ROLLUP_COLUMNS)
+    placeholders = ", ".join("?" * (len(ROLLUP_COLUMNS) + 1))
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in ROLLUP_COLUMNS)
+    return (
+        f"INSERT INTO {table} (bucket, {columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT(bucket) DO UPDATE SET {updates}"
+    )
+
+
+class HistoryStore:
+    """
+    ### SQLite posture history with per-minute and per-hour rollups
+
+    Record inferred frames only, including frames without a pose (no
+    metrics), which are accounted as away time. Frames are buffered in memory and
+    written in one transaction every `batch_size` frames or `flush_interval`
+    seconds. Each flush also adds the batch's totals to the minute and hour
+    rollup rows (an UPSERT per touched bucket), so range queries read a few
+    hundred rollup rows instead of scanning raw frames. Raw frames older than
+    `retention_days` are pruned every `prune_interval` seconds while flushing.
+
+    Time is accounted like :class:`posture_clock.PostureClock`: the seconds
+    since the previous frame belong to the previous frame's state (and to its
+    minute/hour bucket), and gaps longer than `max_gap` only count as `max_gap`.
+    Each second goes to exactly one of away (no pose), standing, good or bad,
+    so the totals add up to the recorded time.
+
+    Args:
+    * path: database file, created if missing
+    * batch_size: frames buffered between writes
+    * flush_interval: longest seconds between writes
+    * retention_days: days raw frames are kept, the rollups are kept forever
+    * prune_interval: seconds between deletions of expired raw frames
+    * max_gap: longest seconds accounted between two frames, above the
+      scheduler's longest inference interval
+
+    Example:
+    `history = HistoryStore("history.db")`
+    `history.record(time.time(), score.good, standing, metrics)`
+    `rows = history.hourly(days=7)`
+    `history.close()`
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        flush_interval: float = 10.0,
+        retention_days: float = 30,
+        prune_interval: float = 3600.0,
+        max_gap: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        self.max_gap = max_gap
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        # readers (e.g. the history CLI) do not block the app's writes
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            SCHEMA.format(
+                rollups="".join(ROLLUP_TABLE.format(table=t) for t in ROLLUPS)
+            )
+        )
+        self._migrate()
+        self.frames = []
+        self.alerts = []
+        self.last_flush = time.monotonic()
+        # pruned on the first flush, then every prune_interval
+        self.last_prune = float("-inf")
+        self._last = None
+
+    def _migrate(self) -> None:
+        """Add rollup columns missing from databases created by older versions."""
+        for table in ROLLUPS:
+            existing = {
+                row[1] for row in self.db.execute(f"PRAGMA table_info({table})")
+            }
+            for column in ROLLUP_COLUMNS:
+                if column not in existing:
+                    self.db.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} REAL NOT NULL DEFAULT 0"
+                    )
+        self.db.commit()
+
+    def record(
+        self, timestamp: float, good: bool | None, standing: bool, metrics=None
+    ) -> None:
+        """
+        ### Add one frame's posture state
+
+        Args:
+        * timestamp: wall-clock time of the frame (time.time())
+        * good: whether the posture is good, None if it was not scored (standing or no pose)
+        * standing: result of :func:`posture_boolean.is_standing`
+        * metrics: :class:`pose_utils.PostureMetrics` for the inclination means, or None
+        """
+        neck = torso = None
+        if metrics is not None:
+            neck, torso = metrics.neck_inclination, metrics.torso_inclination
+        self.frames.append((timestamp, good, standing, neck, torso))
+        if (
+            len(self.frames) >= self.batch_size
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def record_alert(self, timestamp: float) -> None:
+        self.alerts.append(timestamp)
+
+    def _rollup_rows(self) -> dict[int, list]:
+        """Per-minute totals of the buffered frames and alerts."""
+        minutes = {}
+
+        def bucket(timestamp: float) -> list:
+            minute = int(timestamp // 60) * 60
+            if minute not in minutes:
+                minutes[minute] = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0]
+            return minutes[minute]
+
+        for timestamp, good, standing, neck, torso in self.frames:
+            if self._last is not None:
+                last_timestamp, last_column = self._last
+                dt = max(min(timestamp - last_timestamp, self.max_gap), 0.0)
+                # the time since the last frame belongs to its state and bucket
+                if last_column is not None:
+                    bucket(last_timestamp)[last_column] += dt
+            if neck is None:
+                column = 3
+            elif standing:
+                column = 2
+            elif good is None:
+                column = None
+            else:
+                column = 0 if good else 1
+            self._last = (timestamp, column)
+            if neck is not None:
+                row = bucket(timestamp)
+                row[4] += neck
+                row[5] += torso
+                row[6] += 1
+        for timestamp in self.alerts:
+            bucket(timestamp)[7] += 1
+        return minutes
+
+    def flush(self) -> None:
+        """Write the buffered frames and update the rollups in one transaction."""
+        self.last_flush = time.monotonic()
+        if not self.frames and not self.alerts:
+            return
+        minutes = self._rollup_rows()
+        hours = {}
+        for minute, row in minutes.items():
+            total = hours.setdefault(minute // 3600 * 3600, [0] * len(row))
+            for i, value in enumerate(row):
+                total[i] += value
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO frames VALUES (?, ?, ?, ?, ?)", self.frames
+            )
+            for table, buckets in (("rollup_minute", minutes), ("rollup_hour", hours)):
+                self.db.executemany(
+                    _upsert(table),
+                    [(bucket, *row) for bucket, row in buckets.items()],
+                )
+        self.frames.clear()
+        self.alerts.clear()
+        if time.monotonic() - self.last_prune >= self.prune_interval:
+            self.prune()
+
+    def prune(self, now: float | None = None) -> int:
+        """Delete raw frames older than `retention_days`, returns the number deleted."""
+        now = time.time() if now is None else now
+        self.last_prune = time.monotonic()
+        with self.db:
+            cursor = self.db.execute(
+                "DELETE FROM frames WHERE ts < ?",
+                (now - self.retention_days * 86400,),
+            )
+        return cursor.rowcount
+
+    def _query(self, table: str, start: float, end: float) -> list[dict]:
+        self.flush()
+        size = ROLLUPS[table]
+        rows = self.db.execute(
+            f"SELECT bucket, {', '.join(ROLLUP_COLUMNS)} FROM {table} "
+            "WHERE bucket >= ? AND bucket < ? ORDER BY bucket",
+            (int(start // size) * size, end),
+        )
+        return [
+            {
+                "start": bucket,
+                "good_seconds": round(good, 1),
+                "bad_seconds": round(bad, 1),
+                "standing_seconds": round(standing, 1),
+                "away_seconds": round(away, 1),
+                "neck_inclination": round(neck / scored, 1) if scored else None,
+                "torso_inclination": round(torso / scored, 1) if scored else None,
+                "alerts": alerts,
+            }
+            for bucket, good, bad, standing, away, neck, torso, scored, alerts in rows
+        ]
+
+    def hourly(self, days: float = 7, now: float | None = None) -> list[dict]:
+        """
+        ### Per-hour totals of the last `days` days, from the hour rollups
+
+        Returns:
+        * one dict per hour with data: start (epoch seconds), good/bad/standing/away
+          seconds, mean neck/torso inclination and alerts
+        """
+        now = time.time() if now is None else now
+        return self._query("rollup_hour", now - days * 86400, now)
+
+    def minutely(self, start: float, end: float | None = None) -> list[dict]:
+        """Per-minute totals between two wall-clock times, from the minute rollups."""
+        return self._query("rollup_minute", start, time.time() if end is None else end)
+
+    def close(self) -> None:
+        self.flush()
+        self.prune()
+        self.db.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Show the recorded posture history")
+    parser.add_argument("--db", default="history.db")
+    parser.add_argument("--days", type=float, default=7)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist, run the app to record some history")
+    history = HistoryStore(args.db)
+    print(
+        f"{'hour':<17} {'good':>7} {'bad':>7} {'stand':>7} {'away':>7} "
+        f"{'neck':>5} {'alerts':>6}"
+    )
+    for row in history.hourly(args.days):
+        hour = time.strftime("%Y-%m-%d %H:00", time.localtime(row["start"]))
+        neck = "" if row["neck_inclination"] is None else row["neck_inclination"]
+        print(
+            f"{hour:<17} {row['good_seconds'] / 60:>6.1f}m {row['bad_seconds'] / 60:>6.1f}m "
+            f"{row['standing_seconds'] / 60:>6.1f}m {row['away_seconds'] / 60:>6.1f}m "
+            f"{neck:>5} {row['alerts']:>6}"
+        )
+    history.db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+
+from pose_utils import LANDMARK_COUNT
+
+
+class LandmarkFilter:
+    """
+    ### Streaming One Euro filter over the (33, 4) landmark array
+
+    Smooths x, y, z of every landmark in place, vectorized over the whole
+    array, with a fixed amount of state (no history is kept). The One Euro
+    filter adapts its cutoff to the landmark's speed: jitter while sitting
+    still is smoothed heavily, while real movement passes with little lag.
+
+    Before filtering, landmarks with a visibility below `min_visibility`, and
+    landmarks that jump more than `max_jump` while below `trusted_visibility`,
+    are rejected and hold their previous filtered position. A landmark is
+    accepted again after `max_rejections` rejected frames in a row, so a real
+    fast move is never held for long. Visibility itself is passed through.
+
+    Args:
+    * min_cutoff: cutoff frequency (Hz) when still, lower smooths more
+    * beta: how quickly the cutoff rises with speed, higher lags less
+    * d_cutoff: cutoff frequency (Hz) of the speed estimate
+    * min_visibility: landmarks below this visibility are always rejected
+    * trusted_visibility: landmarks at or above this visibility are never rejected for jumping
+    * max_jump: normalized x/y distance between frames counted as an outlier
+    * max_rejections: consecutive rejections before a landmark is accepted anyway
+    * max_gap: seconds without landmarks after which the filter restarts
+
+    Example:
+    `smoother = LandmarkFilter()`
+    `landmarks = smoother.apply(buffer.fill(results.pose_landmarks))`
+    `metrics = calculate_posture_metrics(landmarks, w, h)`
+    """
+
+    def __init__(
+        self,
+        min_cutoff: float = 1.0,
+        beta: float = 10.0,
+        d_cutoff: float = 1.0,
+        min_visibility: float = 0.3,
+        trusted_visibility: float = 0.8,
+        max_jump: float = 0.1,
+        max_rejections: int = 3,
+        max_gap: float = 1.0,
+    ) -> None:
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.min_visibility = min_visibility
+        self.trusted_visibility = trusted_visibility
+        self.max_jump = max_jump
+        self.max_rejections = max_rejections
+        self.max_gap = max_gap
+        self.rejected = 0
+        # filter state, preallocated so applying the filter does not allocate arrays per landmark
+        self._value = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+        self._speed = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+        self._raw = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+        self._rejections = np.zeros(LANDMARK_COUNT, dtype=np.int32)
+        self._last = None
+
+    def reset(self) -> None:
+        self._last = None
+        self._rejections[:] = 0
+
+    def apply(
+        self, landmarks: np.ndarray | None, now: float | None = None
+    ) -> np.ndarray | None:
+        """
+        ### Filter a frame's landmarks in place
+
+        Args:
+        * landmarks: (33, 4) landmark array, or None if no pose was detected (restarts the filter)
+        * now: monotonic (or source) timestamp, defaults to time.monotonic()
+
+        Returns:
+        * the same array, smoothed, or None
+        """
+        if landmarks is None:
+            self.reset()
+            return None
+        now = time.monotonic() if now is None else now
+        raw = self._raw
+        np.copyto(raw, landmarks[:, :3])
+
+        if self._last is None or now - self._last > self.max_gap:
+            self._last = now
+            np.copyto(self._value, raw)
+            self._speed[:] = 0
+            self._rejections[:] = 0
+            return landmarks
+        dt = now - self._last
+        if dt <= 0:
+            # nothing to smooth against, repeat the last filtered position
+            landmarks[:, :3] = self._value
+            return landmarks
+        self._last = now
+
+        visibility = landmarks[:, 3]
+        jump = np.abs(raw[:, :2] - self._value[:, :2]).max(axis=1)
+        reject = (visibility < self.min_visibility) | (
+            (jump > self.max_jump) & (visibility < self.trusted_visibility)
+        )
+        reject &= self._rejections < self.max_rejections
+        self._rejections[reject] += 1
+        self._rejections[~reject] = 0
+        self.rejected += int(reject.sum())
+        # a rejected landmark holds its filtered position
+        raw[reject] = self._value[reject]
+
+        speed = (raw - self._value) / dt
+        self._speed += _alpha(self.d_cutoff, dt) * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._speed)
+        self._value += _alpha(cutoff, dt) * (raw - self._value)
+
+        landmarks[:, :3] = self._value
+        return landmarks
+
+
+def _alpha(cutoff, dt: float):
+    """Smoothing factor of a first order low-pass filter at `cutoff` Hz."""
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
@@ -1,30 +1,108 @@
+from startup import StartupProfiler, Warmup
 from PySimpleGUI import running_mac, running_windows
 import cv2
 import PySimpleGUI as sg
-import mediapipe as mp
-from pose_utils import process_frame, calculate_posture_metrics
+from pose_utils import inference_counter
 from gui_functions import (
     draw_posture_indicators,
     toggle_button_images,
-    alert_user,
+    resource_path,
     Timer,
 )
-from posture_boolean import is_standing
+from alerts import AlertEngine
+from calibration import Calibration, CalibrationProfile, profile_path
+from posture_boolean import DEFAULT_BASELINE
+from posture_evaluator import PostureEvaluator
+from pipeline import PosturePipeline
+from backends import create_backend
+from scheduler import AdaptiveScheduler
+from posture_clock import PostureClock, good_seconds, bad_seconds, standing_seconds
+from preview import PreviewEncoder
+from session_recorder import SessionRecorder
+from history import HistoryStore
+from governor import CpuGovernor, lower_priority
+from posture_stream import StatePublisher, PostureState, default_socket_path
+from telemetry import registry, MetricsServer
+from view_state import ViewState
 import warnings
+import functools
+import os
+import time
 
 # Suppresses a near-dated mediapipe dependency
 warnings.filterwarnings("ignore", category=UserWarning, module="google.protobuf")
 
 
+def _open_camera():
+    cap = cv2.VideoCapture(0)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    if not cap.isOpened():
+        raise OSError("Error: Unable to access the camera")
+    # posture timing uses the measured rate, not this nominal fps
+    cap.set(cv2.CAP_PROP_FPS, 10.0)
+    return cap
+
+
+def _release_warmup(warmup: Warmup) -> None:
+    """Close the pose backend and camera of a warm-up whose results are not used."""
+    warmup.close(pose=lambda backend: backend.close(), camera=lambda cap: cap.release())
+
+
 def main():
     # APP posture limits
 
-    total_time = 0
-    total_frames = 0
     POSTURE_WARNING_TIME = 5
 
     FONT = cv2.FONT_HERSHEY_SIMPLEX
 
+    # Preview settings, the preview refreshes independently of posture analysis
+    PREVIEW_FORMAT = "ppm"
+    PREVIEW_SCALE = 1.0
+    PREVIEW_FPS = 15
+
+    # Session logs are written here while recording is toggled on
+    SESSION_DIR = "sessions"
+
+    # Posture history database, summarized with `python history.py` (None disables)
+    HISTORY_DB = "history.db"
+
+    # The Pomodoro cycle is saved here and picked up again after a restart
+    POMODORO_STATE = "pomodoro.json"
+
+    # Pose inference backend, "legacy", "tasks" (needs a .task POSE_MODEL) or
+    # "onnx" (needs an .onnx POSE_MODEL, runs on POSE_THREADS cores, 0 for all).
+    # The tasks backend runs in POSE_RUNNING_MODE ("video" or "live_stream")
+    # on the POSE_DELEGATE ("cpu" or "gpu")
+    POSE_BACKEND = "legacy"
+    POSE_MODEL = None
+    POSE_THREADS = 0
+    POSE_RUNNING_MODE = "video"
+    POSE_DELEGATE = "cpu"
+
+    # Seconds of good posture averaged into the baseline by the baseline buttons,
+    # the profile is saved per user and loaded on the next start
+    CALIBRATION_SECONDS = 10
+
+    # Longest wait for a GUI event before polling the pipeline for a new result
+    FRAME_POLL_MS = 30
+
+    # Prometheus-style metrics on http://127.0.0.1:TELEMETRY_PORT/metrics (None disables),
+    # and optionally dumped to TELEMETRY_FILE every TELEMETRY_DUMP_INTERVAL seconds
+    TELEMETRY_PORT = 9464
+    TELEMETRY_FILE = None
+    TELEMETRY_DUMP_INTERVAL = 10
+
+    # Share of all CPU cores the app aims to stay within (None disables the governor);
+    # above it OpenCV threads, the inference rate and the preview rate are reduced
+    CPU_BUDGET = 0.25
+    # run at a lower scheduling priority than compilers, video calls etc.
+    LOWER_PRIORITY = True
+
+    # Posture state is broadcast to other local apps on this Unix socket, read
+    # it with `python posture_stream.py` (None disables, unsupported on Windows)
+    STATE_SOCKET = default_socket_path()
+
     # Colors
     RED = (50, 50, 255)
     LIGHT_GREEN = (127, 233, 100)
@@ -37,33 +115,34 @@ def main():
     # get the base64 strings for the button images
     toggle_btn_off, toggle_btn_on = toggle_button_images()
 
-    # Initialize poses
-    pose = mp.solutions.pose.Pose(static_image_mode=False, model_complexity=0)
-
-    # default values set for offset and inclination conditions
-    nrml_offset = 260
-    nrml_neck_inclination = 30
-    nrml_torso_inclination = 4
-    my_closeness = 420
-    my_shldr_distance = 270
-    my_shldr_level = 10
+    # the window is shown while the pose model loads and the camera opens
+    profiler = StartupProfiler()
+    profiler.mark("imports")
+    # mediapipe takes over a second to import, it is only loaded on the warm-up thread
+    create_pose = functools.partial(
+        create_backend,
+        POSE_BACKEND,
+        POSE_MODEL,
+        threads=POSE_THREADS,
+        running_mode=POSE_RUNNING_MODE,
+        delegate=POSE_DELEGATE,
+    )
+    warmup = Warmup(profiler, pose=create_pose, camera=_open_camera)
+    warmup.start()
 
     # Used to adjust the posture conditionals
     easiness = 5
 
-    # check if webcam opens
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    if not cap.isOpened():
-        sg.Popup("Error: Unable to access the camera")
-        return
-
-    # Get image metadata
-    cap.set(cv2.CAP_PROP_FPS, 10.0)
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    # width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    # default values set for offset and inclination conditions, replaced by the
+    # user's calibration profile if one was saved
+    evaluator = PostureEvaluator(DEFAULT_BASELINE, easiness)
+    try:
+        evaluator.set_calibration(CalibrationProfile.load(profile_path()))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Ignoring calibration profile: {e}")
+    baseline = evaluator.baseline
 
     # Initialize Tabgroups
     tab1_layout = [
@@ -151,20 +230,40 @@ def main():
                 border_width=0,
             ),
         ],
+        [
+            sg.Text("Record Session (On/Off):"),
+            sg.Button(
+                "",
+                image_data=toggle_btn_off,
+                key="-TOGGLE-RECORD-",
+                button_color=(sg.theme_background_color(), sg.theme_background_color()),
+                border_width=0,
+            ),
+        ],
         [sg.Text("Baseline posture data: ")],
         [
             sg.Text(
-                f"offset: {int(nrml_offset)} \
-                              \nneck: {int(nrml_neck_inclination)} \
-                              \ntorso: {int(nrml_torso_inclination)}\
+                f"offset: {int(baseline['offset'])} \
+                              \nneck: {int(baseline['neck_inclination'])} \
+                              \ntorso: {int(baseline['torso_inclination'])}\
                               \nEasiness {easiness}\
-                              \nCloseness {int(my_closeness)}\
-                              \nShldr level {int(my_shldr_level)}\
-                              \nshldr distance {int(my_shldr_distance)}",
+                              \nCloseness {int(baseline['closeness'])}\
+                              \nShldr level {int(baseline['shldr_level'])}\
+                              \nshldr distance {int(baseline['shldr_distance'])}",
                 key="-DEBUG-POSTURE-TEXT-",
             )
         ],
         [sg.Text("Standing/Sitting:"), sg.Text("", key="-STANDING-SITTING-DEBUG-")],
+        [
+            sg.Text("Inferences/Conversions per frame:"),
+            sg.Text("", key="-INFERENCE-DEBUG-"),
+        ],
+        [
+            sg.Text("Latency / dropped frames / inference interval:"),
+            sg.Text("", key="-LATENCY-DEBUG-"),
+        ],
+        [sg.Text("Capture / inference fps:"), sg.Text("", key="-FPS-DEBUG-")],
+        [sg.Text("CPU usage / budget:"), sg.Text("", key="-CPU-DEBUG-")],
         [
             sg.Button(
                 button_text="Change The Baseline Posture To Current Frame",
@@ -187,7 +286,10 @@ def main():
         ],
     ]
     # Initialize column layouts``
-    column1_layout = [[sg.Image(filename="", key="image")]]
+    column1_layout = [
+        [sg.Image(filename="", key="image")],
+        [sg.Text("Starting camera and pose model...", key="-STATUS-")],
+    ]
     column2_layout = [
         [
             sg.Frame(
@@ -218,38 +320,111 @@ def main():
 
     # initialize window
     window = sg.Window(
-        "Webcam Window", layout, location=(0, 0), resizable=True, size=(1000, 700)
+        "Webcam Window",
+        layout,
+        location=(0, 0),
+        resizable=True,
+        size=(1000, 700),
+        finalize=True,
     )
+    profiler.mark("window")
 
-    good_frames = 0
-    bad_frames = 0
     display_annotations = True
     display_data = True
     play_audio = True
     automatic_standing_timer = False
     display_cv2_video = True
+    record_session = False
 
-    alert_interval = 5  # Minimum interval between alerts in seconds
-    last_alert_time = 0  # Tracks the last time the alert was played
-
-    timer = Timer(window)
+    # audio is initialized and decoded once, alerts play on their own thread
+    alerts = AlertEngine(min_interval=5)  # Minimum interval between alerts in seconds
+    alerts.add_sound("buzz", resource_path("buzz-notif.mp3"))
+    alerts.start()
+    posture_clock = PostureClock()
 
-    while True:
-        success, image = cap.read()
+    encode_seconds = registry.histogram(
+        "posture_preview_encode_seconds", "Preview frame encoding"
+    )
+    time_to_first_frame = registry.gauge(
+        "posture_time_to_first_frame_seconds", "Seconds from launch to the first frame"
+    )
+    metrics_server = None
+    if TELEMETRY_PORT is not None:
+        try:
+            metrics_server = MetricsServer(registry, port=TELEMETRY_PORT)
+            metrics_server.start()
+        except OSError as e:
+            # e.g. a second instance already serves the port, the app runs without it
+            print(f"Metrics endpoint disabled: {e}")
+    last_telemetry_dump = time.monotonic()
+
+    calibration = None
+
+    # widget text is only pushed to Tk when it changed, debug readouts at most 4x/sec
+    view = ViewState(
+        window,
+        min_interval=0.25,
+        intervals={
+            "-DISPLAYTIMER-": 0,
+            "-DONE-KEY-": 0,
+            "-AUTO-STANDING-TEXT": 0,
+            "-STANDING-SITTING-DEBUG-": 0,
+            "-DEBUG-POSTURE-TEXT-": 0,
+        },
+    )
+    timer = Timer(view, state_path=POMODORO_STATE)
+    preview = PreviewEncoder(
+        fmt=PREVIEW_FORMAT, scale=PREVIEW_SCALE, max_fps=PREVIEW_FPS
+    )
 
-        if not success:
-            sg.popup("Error reading image, plugin your camera and restart app")
-            break
+    # keep the window responsive until the camera and pose model are ready
+    while not warmup.done:
+        event, values = window.read(timeout=50)
+        if event == sg.WINDOW_CLOSED:
+            alerts.stop()
+            window.close()
+            _release_warmup(warmup)
+            return
+        if values is not None:
+            timer.check_buttons(values, event)
+        timer.update_timer()
+        view.render()
+    if warmup.error:
+        sg.Popup(f"{warmup.error}")
+        _release_warmup(warmup)
+        alerts.stop()
+        window.close()
+        return
+    backend, cap = warmup.results["pose"], warmup.results["camera"]
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        results, image = process_frame(image, pose)
+    # capture and inference run on their own threads, the loop only consumes results
+    # inference backs off while the user sits still in good posture
+    pipeline = PosturePipeline(
+        cap, backend, AdaptiveScheduler(warning_time=POSTURE_WARNING_TIME)
+    )
+    pipeline.start()
+    first_frame = True
+    if LOWER_PRIORITY and not lower_priority():
+        print("Could not lower the process priority")
+    governor = (
+        CpuGovernor(CPU_BUDGET, pipeline.scheduler, preview) if CPU_BUDGET else None
+    )
+    history = HistoryStore(HISTORY_DB) if HISTORY_DB else None
+    publisher = None
+    if STATE_SOCKET:
+        try:
+            publisher = StatePublisher(STATE_SOCKET)
+        except OSError as e:
+            print(f"Posture state stream disabled: {e}")
 
-        event, values = window.read(timeout=30)
+    while True:
+        # wake up for the next frame, or earlier when the timer display changes
+        event, values = window.read(timeout=timer.timeout_ms(FRAME_POLL_MS))
 
         if event is not None and values is not None:
             timer.check_buttons(values, event)
-            timer.update_timer()
-
-        # if timer is running calculate and update time
+        timer.update_timer()
 
         if event == sg.WINDOW_CLOSED:
             break
@@ -264,6 +439,21 @@ def main():
             window["-TOGGLE-DATA-"].update(
                 image_data=toggle_btn_on if display_data else toggle_btn_off
             )
+        elif event == "-TOGGLE-RECORD-":
+            record_session = not record_session
+            window["-TOGGLE-RECORD-"].update(
+                image_data=toggle_btn_on if record_session else toggle_btn_off
+            )
+            recorder = None
+            if record_session:
+                recorder = SessionRecorder(
+                    os.path.join(
+                        SESSION_DIR, time.strftime("session-%Y%m%d-%H%M%S.ppsess")
+                    )
+                )
+            previous_recorder = pipeline.set_recorder(recorder)
+            if previous_recorder is not None:
+                previous_recorder.close()
         elif event == "-TOGGLE-AUDIO-":
             play_audio = not play_audio
             window["-TOGGLE-AUDIO-"].update(
@@ -275,177 +465,242 @@ def main():
                 image_data=toggle_btn_on if automatic_standing_timer else toggle_btn_off
             )
             if not automatic_standing_timer:
-                window["-AUTO-STANDING-TEXT"].update("")
+                view.set("-AUTO-STANDING-TEXT", "")
         elif event == "-TOGGLE-VIDEO-":
             display_cv2_video = not display_cv2_video
             window["-TOGGLE-VIDEO-"].update(
                 image_data=toggle_btn_on if display_cv2_video else toggle_btn_off
             )
+            if not display_cv2_video:
+                window["image"].update(data=None)
         elif event == "-SLIDER-":
             # get slider value and invert it for usable posture Easiness
             easiness = int(values["-SLIDER-"]) % 11
+            evaluator.easiness = easiness
+        elif event == "-BASELINE-BUTTON" or event == "-BASELINE-BUTTON2":
+            # averaged over the next CALIBRATION_SECONDS of processed sitting frames
+            calibration = Calibration(CALIBRATION_SECONDS)
+            view.set("-STATUS-", "Calibrating, sit with a good posture...")
+
+        alert_error = alerts.pop_error()
+        if alert_error:
+            sg.Popup(f"{alert_error}")
+        if pipeline.error:
+            sg.popup(pipeline.error)
+            break
 
-        if is_standing(results.pose_landmarks) and automatic_standing_timer:
-            window["-STANDING-SITTING-DEBUG-"].update("Standing")
-            window["-AUTO-STANDING-TEXT"].update("Standing")
-            timer.check_buttons(values, event, auto_next=True)
-        elif not is_standing(results.pose_landmarks) and automatic_standing_timer:
-            window["-STANDING-SITTING-DEBUG-"].update("Sitting")
-            window["-AUTO-STANDING-TEXT"].update("Sitting")
-            timer.check_buttons(values, event, auto_start=True)
-
-        if results.pose_landmarks:
+        result = pipeline.latest_result()
+        if result is None:
+            view.render()
+            continue
+        image, metrics = result.image, result.metrics
+        if first_frame:
+            first_frame = False
+            profiler.mark("first_frame")
+            time_to_first_frame.set(profiler.elapsed("first_frame"))
+            profiler.print_report()
+            view.set("-STATUS-", "")
+
+        if result.standing and automatic_standing_timer:
+            view.set("-STANDING-SITTING-DEBUG-", "Standing")
+            view.set("-AUTO-STANDING-TEXT", "Standing")
+            # the loop's event was handled above, passing it again would
+            # advance or (un)pause the timer a second time
+            timer.check_buttons(values, None, auto_next=True)
+        elif not result.standing and automatic_standing_timer:
+            view.set("-STANDING-SITTING-DEBUG-", "Sitting")
+            view.set("-AUTO-STANDING-TEXT", "Sitting")
+            timer.check_buttons(values, None, auto_start=True)
+
+        posture_good = False
+        if metrics:
             try:
-                metrics = calculate_posture_metrics(pose, image)
-                if metrics:
-                    l_shldr_x, l_shldr_y = metrics["l_shldr_x"], metrics["l_shldr_y"]
-                    r_shldr_x, r_shldr_y = metrics["r_shldr_x"], metrics["r_shldr_y"]
-                    l_ear_x, l_ear_y = metrics["l_ear_x"], metrics["l_ear_y"]
-                    l_hip_x, l_hip_y = metrics["l_hip_x"], metrics["l_hip_y"]
-                    shldr_distance = metrics["shldr_distance"]
-                    neck_inclination = metrics["neck_inclination"]
-                    torso_inclination = metrics["torso_inclination"]
-                    closeness = metrics["closeness"]
-                    shldr_level = metrics["shldr_level"]
-
-                    if event == "-BASELINE-BUTTON" or event == "-BASELINE-BUTTON2":
-                        nrml_neck_inclination = neck_inclination
-                        nrml_torso_inclination = torso_inclination
-                        my_shldr_distance = shldr_distance
-                        my_closeness = closeness
-                        my_shldr_level = shldr_level
-
-                        window[
-                            "-DEBUG-POSTURE-TEXT-"
-                        ].update(f"offset: {int(nrml_offset)} \
-                              \nneck: {int(nrml_neck_inclination)} \
-                              \ntorso: {int(nrml_torso_inclination)} \
-                              \nEasiness {int(easiness)} \
-                              \nCloseness {int(my_closeness)} \
-                              \nShldr level {int(my_shldr_level)} \
-                              \nshldr distance {int(my_shldr_distance)}")
-
-                    good_time = good_frames / fps
-                    bad_time = bad_frames / fps
-
-                    good_closeness = True
-                    good_shldr = True
-                    good_neck = True
-
-                    if (
-                        closeness + (easiness * 20)
-                        > my_closeness
-                        > closeness - (easiness * 50)
-                    ):
-                        closeness_color = LIGHT_GREEN
-                    else:
-                        closeness_color = RED
-                        good_closeness = False
-
-                    if (
-                        neck_inclination + easiness + 5
-                        > nrml_neck_inclination
-                        > neck_inclination - easiness + 5
-                    ):
-                        neck_color = LIGHT_GREEN
-                    else:
-                        neck_color = RED
-                        good_neck = False
-                        # good_neck = True
-
-                    if (
-                        shldr_level + easiness * 5
-                        > my_shldr_level
-                        > shldr_level - easiness * 5
-                    ):
-                        color = LIGHT_GREEN
-                        shldr_level_color = LIGHT_GREEN
-                    else:
-                        shldr_level_color = RED
-                        good_neck = False
-
-                    if good_closeness and good_shldr and good_neck:
-                        color = LIGHT_GREEN
-                        bad_frames = 0
-                        good_frames += 1
-                    else:
-                        color = RED
-                        good_frames = 0
-                        bad_frames += 1
-
-                    total_frames += 1
-
-                    if display_annotations:
-                        draw_posture_indicators(
-                            image,
-                            l_shldr_x,
-                            l_shldr_y,
-                            r_shldr_x,
-                            r_shldr_y,
-                            l_ear_x,
-                            l_ear_y,
-                            l_hip_x,
-                            l_hip_y,
-                            color,
-                        )
-
-                    if display_data:
-                        cv2.putText(
-                            image,
-                            f"Neck: {int(neck_inclination)}",
-                            (10, 30),
-                            FONT,
-                            0.9,
-                            neck_color,
-                            2,
-                        )
-                        cv2.putText(
-                            image,
-                            f"shldr_level: {shldr_level}",
-                            (10, 60),
-                            FONT,
-                            0.9,
-                            shldr_level_color,
-                            2,
+                l_shldr_x, l_shldr_y = metrics.l_shldr_x, metrics.l_shldr_y
+                r_shldr_x, r_shldr_y = metrics.r_shldr_x, metrics.r_shldr_y
+                l_ear_x, l_ear_y = metrics.l_ear_x, metrics.l_ear_y
+                l_hip_x, l_hip_y = metrics.l_hip_x, metrics.l_hip_y
+                neck_inclination = metrics.neck_inclination
+                closeness = metrics.closeness
+                shldr_level = metrics.shldr_level
+
+                # only freshly inferred frames, reused metrics would shrink the variance
+                if calibration is not None and not result.standing and result.inferred:
+                    # keep real samples coming instead of backing off
+                    pipeline.scheduler.wake()
+                    if not calibration.add(metrics):
+                        view.set(
+                            "-STATUS-",
+                            f"Calibrating, sit with a good posture... {calibration.progress():.0%}",
                         )
-                        cv2.putText(
-                            image,
-                            f"Closeness: {int(closeness)}",
-                            (10, 90),
-                            FONT,
-                            0.9,
-                            closeness_color,
-                            2,
-                        )
-                        cv2.putText(
-                            image,
-                            f"Good Posture Time: {round(good_time, 1)}s"
-                            if good_time > 0
-                            else f"Bad Posture Time: {round(bad_time, 1)}s",
-                            (10, height - 20),
-                            FONT,
-                            0.9,
-                            color,
-                            2,
-                        )
-
-                    if bad_time > POSTURE_WARNING_TIME:
-                        total_time = total_frames / fps
-                        if total_time - last_alert_time > alert_interval:
-                            last_alert_time = total_time
-                            if play_audio:
-                                alert_user()
+                    else:
+                        profile = calibration.profile()
+                        calibration = None
+                        evaluator.set_calibration(profile)
+                        baseline = evaluator.baseline
+                        try:
+                            profile.save(profile_path())
+                        except OSError as e:
+                            print(f"Calibration profile not saved: {e}")
+                        view.set("-STATUS-", "")
+
+                    view.set(
+                        "-DEBUG-POSTURE-TEXT-",
+                        f"offset: {int(baseline['offset'])} \
+                          \nneck: {int(baseline['neck_inclination'])} \
+                          \ntorso: {int(baseline['torso_inclination'])} \
+                          \nEasiness {int(easiness)} \
+                          \nCloseness {int(baseline['closeness'])} \
+                          \nShldr level {int(baseline['shldr_level'])} \
+                          \nshldr distance {int(baseline['shldr_distance'])}",
+                    )
+
+                score = evaluator.update(metrics)
+                posture_good = score.good
+                pipeline.scheduler.report_posture(score.good)
+                now = time.monotonic()
+                # posture is only scored while sitting, like headless and multicam
+                posture_clock.update(
+                    None if result.standing else score.good, result.standing, now
+                )
+                good_time = posture_clock.good_time
+                bad_time = posture_clock.bad_time
+                good_seconds.set(posture_clock.good_seconds)
+                bad_seconds.set(posture_clock.bad_seconds)
+                standing_seconds.set(posture_clock.standing_seconds)
+                closeness_color = LIGHT_GREEN if score.good_closeness else RED
+                neck_color = LIGHT_GREEN if score.good_neck else RED
+                shldr_level_color = LIGHT_GREEN if score.good_shldr_level else RED
+                color = LIGHT_GREEN if score.good else RED
+
+                if bad_time > POSTURE_WARNING_TIME and play_audio:
+                    if alerts.alert("buzz") and history is not None:
+                        history.record_alert(time.time())
 
             except TypeError as e0:
                 sg.Popup(f"TYPE ERROR CAUGHT: {e0}")
             except UnboundLocalError as e1:
                 sg.Popup(f"UnboundLocalError caught: {e1}")
-        if display_cv2_video:
-            imgbytes = cv2.imencode(".png", image)[1].tobytes()
-            window["image"].update(data=imgbytes)
-        else:
-            window["image"].update(data=None)
-
+        # reused results would only repeat the last inferred state
+        if history is not None and result.inferred:
+            history.record(
+                time.time(),
+                posture_good if metrics and not result.standing else None,
+                result.standing,
+                metrics,
+            )
+        if publisher is not None:
+            publisher.publish(
+                PostureState(
+                    time.time(),
+                    metrics is not None,
+                    posture_good,
+                    result.standing,
+                    posture_clock.good_time,
+                    posture_clock.bad_time,
+                    timer.pomodoro.phase,
+                    timer.pomodoro.remaining(),
+                )
+            )
+        view.set(
+            "-INFERENCE-DEBUG-",
+            f"{inference_counter.frame_inferences}/{inference_counter.frame_conversions}",
+        )
+        view.set(
+            "-LATENCY-DEBUG-",
+            f"{int(result.latency * 1000)}ms / {pipeline.stats()['dropped']}"
+            f" / {pipeline.scheduler.interval:.2f}s",
+        )
+        view.set(
+            "-FPS-DEBUG-",
+            f"{pipeline.capture.rate.fps:.1f} / {pipeline.worker.rate.fps:.1f}",
+        )
+        if governor is not None:
+            governor.update()
+            view.set("-CPU-DEBUG-", governor.describe())
+        view.render()
+
+        # overlays are only drawn on frames that are actually shown
+        if display_cv2_video and preview.due():
+            if metrics and display_annotations:
+                draw_posture_indicators(
+                    image,
+                    l_shldr_x,
+                    l_shldr_y,
+                    r_shldr_x,
+                    r_shldr_y,
+                    l_ear_x,
+                    l_ear_y,
+                    l_hip_x,
+                    l_hip_y,
+                    color,
+                )
+
+            if metrics and display_data:
+                cv2.putText(
+                    image,
+                    f"Neck: {int(neck_inclination)}",
+                    (10, 30),
+                    FONT,
+                    0.9,
+                    neck_color,
+                    2,
+                )
+                cv2.putText(
+                    image,
+                    f"shldr_level: {shldr_level}",
+                    (10, 60),
+                    FONT,
+                    0.9,
+                    shldr_level_color,
+                    2,
+                )
+                cv2.putText(
+                    image,
+                    f"Closeness: {int(closeness)}",
+                    (10, 90),
+                    FONT,
+                    0.9,
+                    closeness_color,
+                    2,
+                )
+                cv2.putText(
+                    image,
+                    f"Good Posture Time: {round(good_time, 1)}s"
+                    if good_time > 0
+                    else f"Bad Posture Time: {round(bad_time, 1)}s",
+                    (10, height - 20),
+                    FONT,
+                    0.9,
+                    color,
+                    2,
+                )
+
+            start = time.perf_counter()
+            data = preview.encode(image)
+            encode_seconds.observe(time.perf_counter() - start)
+            window["image"].update(data=data)
+
+        if (
+            TELEMETRY_FILE
+            and time.monotonic() - last_telemetry_dump > TELEMETRY_DUMP_INTERVAL
+        ):
+            last_telemetry_dump = time.monotonic()
+            registry.dump(TELEMETRY_FILE)
+
+    # a worker stuck in inference still uses the backend, leave it open
+    if pipeline.stop():
+        backend.close()
+    else:
+        print("Pose inference did not stop, exiting without closing the backend")
+    alerts.stop()
+    if history is not None:
+        history.close()
+    if publisher is not None:
+        publisher.close()
+    if metrics_server is not None:
+        metrics_server.stop()
+    if TELEMETRY_FILE:
+        registry.dump(TELEMETRY_FILE)
     cap.release()
     window.close()
 
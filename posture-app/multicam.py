@@ -0,0 +1,494 @@
+import argparse
+import multiprocessing
+import queue
+import time
+import warnings
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+from pose_utils import calculate_posture_metrics, LandmarkBuffer, LANDMARK_COUNT
+from backends import BACKENDS, DELEGATES, RUNNING_MODES, create_backend
+from posture_boolean import is_standing
+from posture_evaluator import PostureEvaluator
+from posture_clock import PostureClock, RateMeter
+from landmark_filter import LandmarkFilter
+from roi import RoiTracker
+from sources import open_source
+from headless import JsonlWriter, POSTURE_WARNING_TIME, ALERT_INTERVAL
+
+# Suppresses a near-dated mediapipe dependency
+warnings.filterwarnings("ignore", category=UserWarning, module="google.protobuf")
+
+STATE_STARTING = 0
+STATE_RUNNING = 1
+STATE_DONE = 2
+STATE_ERROR = 3
+
+# the shared memory slot a worker publishes its newest landmarks in. `seq` is a
+# sequence lock: odd while the worker is writing the slot (and the frame buffer)
+SLOT_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("state", "u1"),
+        ("detected", "u1"),
+        ("frame_id", "<u8"),
+        ("timestamp", "<f8"),
+        ("width", "<u4"),
+        ("height", "<u4"),
+        ("landmarks", "<f4", (LANDMARK_COUNT, 4)),
+    ]
+)
+
+
+class StreamConfig(NamedTuple):
+    """
+    One camera or stream, see :func:`sources.open_source` for `kind` and `target`.
+
+    `width` and `height` size the shared preview frame buffer. `backend`,
+    `model`, `threads`, `running_mode` and `delegate` select the worker's pose
+    backend, see :func:`backends.create_backend`.
+    """
+
+    name: str
+    kind: str
+    target: str | None = None
+    fps: float = 10.0
+    frames: int | None = None
+    width: int = 640
+    height: int = 480
+    backend: str = "legacy"
+    model: str | None = None
+    threads: int = 1
+    running_mode: str = "video"
+    delegate: str = "cpu"
+
+
+def stream_worker(
+    config: StreamConfig,
+    slot_name: str,
+    frame_name: str,
+    stop_event,
+    errors,
+    realtime: bool = True,
+    model_complexity: int = 0,
+) -> None:
+    """
+    ### Worker process: reads one stream, runs its own pose backend and publishes the landmarks
+
+    Landmarks (after ROI cropping and smoothing) and the newest frame are
+    written to shared memory; nothing is pickled per frame. File and
+    synthetic sources are paced to their timestamps when `realtime` is set.
+    """
+    slot_shm = shared_memory.SharedMemory(name=slot_name)
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    slot = np.ndarray((), dtype=SLOT_DTYPE, buffer=slot_shm.buf)
+    frame = np.ndarray((config.height, config.width, 3), np.uint8, buffer=frame_shm.buf)
+    backend = None
+    try:
+        source = open_source(config.kind, config.target, config.fps, config.frames)
+        if config.kind != "synthetic":
+            backend = create_backend(
+                config.backend,
+                config.model,
+                model_complexity=model_complexity,
+                threads=config.threads,
+                running_mode=config.running_mode,
+                delegate=config.delegate,
+            )
+        buffer = LandmarkBuffer()
+        roi = RoiTracker()
+        smoother = LandmarkFilter()
+        slot["state"] = STATE_RUNNING
+        start = time.monotonic()
+
+        for frame_id, (timestamp, image, pose_landmarks) in enumerate(source, 1):
+            if stop_event.is_set():
+                break
+            if realtime:
+                delay = start + timestamp - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            box = None
+            if image is not None:
+                crop, box = roi.crop(image)
+                landmarks = backend.detect(crop, timestamp)
+                height, width = image.shape[:2]
+            else:
+                landmarks = buffer.fill(pose_landmarks)
+                width, height = config.width, config.height
+            landmarks = roi.to_full_frame(landmarks, box, width, height)
+            landmarks = smoother.apply(landmarks, timestamp)
+            if image is not None:
+                roi.update(landmarks, is_standing(landmarks))
+
+            slot["seq"] += 1
+            if image is not None:
+                if image.shape == frame.shape:
+                    np.copyto(frame, image)
+                else:
+                    cv2.resize(image, (config.width, config.height), dst=frame)
+            slot["frame_id"] = frame_id
+            slot["timestamp"] = timestamp
+            slot["width"] = width
+            slot["height"] = height
+            slot["detected"] = landmarks is not None
+            if landmarks is not None:
+                slot["landmarks"] = landmarks
+            slot["seq"] += 1
+        slot["state"] = STATE_DONE
+    except Exception as e:
+        slot["state"] = STATE_ERROR
+        errors.put((config.name, f"{type(e).__name__}: {e}"))
+    finally:
+        if backend is not None:
+            backend.close()
+        # views into the shared memory must be released before closing it
+        del slot, frame
+        slot_shm.close()
+        frame_shm.close()
+
+
+class StreamState:
+    """
+    ### Posture state of one stream, kept by the supervisor
+
+    Scores the landmarks published by the stream's worker with its own
+    :class:`PostureEvaluator` and :class:`PostureClock` (on the stream's
+    timestamps), and returns the same events as :mod:`headless`.
+    """
+
+    def __init__(self, name: str, baseline: dict | None, easiness: int) -> None:
+        self.name = name
+        self.evaluator = PostureEvaluator(baseline, easiness)
+        self.clock = PostureClock()
+        self.rate = RateMeter()
+        self.state = STATE_STARTING
+        self.frame_id = 0
+        self.frames = 0
+        self.good = None
+        self.standing = None
+        self.metrics = None
+        self.alerts = 0
+        self.last_alert = None
+        self.last_timestamp = 0.0
+
+    def update(
+        self, timestamp: float, landmarks: np.ndarray | None, width: int, height: int
+    ) -> list[dict]:
+        events = []
+        self.frames += 1
+        self.rate.tick(timestamp)
+        self.last_timestamp = timestamp
+
+        standing = is_standing(landmarks)
+        if standing != self.standing:
+            self.standing = standing
+            self.good = None
+            events.append(self._event(timestamp, "standing" if standing else "sitting"))
+        try:
+            self.metrics = calculate_posture_metrics(landmarks, width, height)
+        except (ValueError, ZeroDivisionError):
+            self.metrics = None
+
+        if not self.metrics or standing:
+            self.clock.update(None, standing, timestamp)
+            return events
+        good = self.evaluator.update(self.metrics).good
+        self.clock.update(good, standing, timestamp)
+        if good != self.good:
+            self.good = good
+            events.append(
+                self._event(timestamp, "posture_good" if good else "posture_bad")
+            )
+        if (
+            not good
+            and self.clock.bad_time > POSTURE_WARNING_TIME
+            and (
+                self.last_alert is None or timestamp - self.last_alert > ALERT_INTERVAL
+            )
+        ):
+            self.last_alert = timestamp
+            self.alerts += 1
+            events.append(
+                self._event(
+                    timestamp, "alert", bad_seconds=round(self.clock.bad_time, 3)
+                )
+            )
+        return events
+
+    def summary(self) -> dict:
+        return {
+            "type": "summary",
+            "stream": self.name,
+            "t": round(self.last_timestamp, 3),
+            "frames": self.frames,
+            "good_seconds": round(self.clock.good_seconds, 3),
+            "bad_seconds": round(self.clock.bad_seconds, 3),
+            "standing_seconds": round(self.clock.standing_seconds, 3),
+            "alerts": self.alerts,
+            "fps": round(self.rate.fps, 2),
+        }
+
+    def _event(self, timestamp: float, name: str, **extra) -> dict:
+        return {
+            "type": "event",
+            "stream": self.name,
+            "t": round(timestamp, 3),
+            "event": name,
+            **extra,
+        }
+
+
+class MultiCameraService:
+    """
+    ### Runs one pose worker process per camera and aggregates their posture state
+
+    Each stream gets its own process (and its own MediaPipe Pose), so
+    inference scales across CPU cores instead of being serialized by the GIL.
+    Workers publish landmarks and the newest frame through shared memory; the
+    supervisor polls them and keeps a :class:`StreamState` per stream.
+
+    Args:
+    * streams: a :class:`StreamConfig` per camera/stream
+    * baseline, easiness: posture settings applied to every stream
+    * realtime: pace file and synthetic sources to their timestamps
+    * model_complexity: MediaPipe Pose model complexity for every worker
+
+    Example:
+    `service = MultiCameraService([StreamConfig("desk1", "webcam", "0"), StreamConfig("desk2", "webcam", "1")])`
+    `service.start()`
+    `events = service.poll()`
+    `service.stop()`
+    """
+
+    def __init__(
+        self,
+        streams: list[StreamConfig],
+        baseline: dict | None = None,
+        easiness: int = 5,
+        realtime: bool = True,
+        model_complexity: int = 0,
+    ) -> None:
+        names = [stream.name for stream in streams]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stream names must be unique: {names}")
+        self.streams = streams
+        self.realtime = realtime
+        self.model_complexity = model_complexity
+        self.states = {name: StreamState(name, baseline, easiness) for name in names}
+        # worker processes are spawned, mediapipe is not safe to use across a fork
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.errors = self.context.Queue()
+        self.processes = {}
+        self._memory = {}
+        self._slots = {}
+        self._frames = {}
+        self._read = np.zeros((), dtype=SLOT_DTYPE)
+
+    def start(self) -> None:
+        for config in self.streams:
+            slot_shm = shared_memory.SharedMemory(create=True, size=SLOT_DTYPE.itemsize)
+            frame_shm = shared_memory.SharedMemory(
+                create=True, size=config.width * config.height * 3
+            )
+            self._memory[config.name] = (slot_shm, frame_shm)
+            slot = np.ndarray((), dtype=SLOT_DTYPE, buffer=slot_shm.buf)
+            slot[...] = np.zeros((), dtype=SLOT_DTYPE)
+            self._slots[config.name] = slot
+            self._frames[config.name] = np.ndarray(
+                (config.height, config.width, 3), np.uint8, buffer=frame_shm.buf
+            )
+            process = self.context.Process(
+                target=stream_worker,
+                args=(
+                    config,
+                    slot_shm.name,
+                    frame_shm.name,
+                    self.stop_event,
+                    self.errors,
+                    self.realtime,
+                    self.model_complexity,
+                ),
+                name=f"posture-{config.name}",
+                daemon=True,
+            )
+            process.start()
+            self.processes[config.name] = process
+
+    def poll(self) -> list[dict]:
+        """
+        ### Score the newest published frame of every stream
+
+        Returns:
+        * the posture events raised since the last poll, across all streams
+        """
+        events = []
+        for name, slot in self._slots.items():
+            state = self.states[name]
+            if not self._read_slot(slot):
+                continue
+            read = self._read
+            state.state = int(read["state"])
+            if read["frame_id"] == state.frame_id:
+                continue
+            state.frame_id = int(read["frame_id"])
+            landmarks = read["landmarks"] if read["detected"] else None
+            events += state.update(
+                float(read["timestamp"]),
+                landmarks,
+                int(read["width"]),
+                int(read["height"]),
+            )
+        while True:
+            try:
+                name, message = self.errors.get_nowait()
+            except queue.Empty:
+                break
+            self.states[name].state = STATE_ERROR
+            events.append(
+                {"type": "event", "stream": name, "event": "error", "message": message}
+            )
+        return events
+
+    def latest_frame(self, name: str) -> np.ndarray | None:
+        """Returns a copy of the newest frame of a stream, or None while it is being written."""
+        slot = self._slots[name]
+        seq = int(slot["seq"])
+        if seq & 1:
+            return None
+        frame = self._frames[name].copy()
+        return frame if int(slot["seq"]) == seq else None
+
+    @property
+    def running(self) -> bool:
+        """True while any worker is still producing frames."""
+        return any(
+            process.is_alive()
+            and self.states[name].state in (STATE_STARTING, STATE_RUNNING)
+            for name, process in self.processes.items()
+        )
+
+    def summary(self) -> list[dict]:
+        return [state.summary() for state in self.states.values()]
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for process in self.processes.values():
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._slots.clear()
+        self._frames.clear()
+        for slot_shm, frame_shm in self._memory.values():
+            for memory in (slot_shm, frame_shm):
+                memory.close()
+                memory.unlink()
+        self._memory.clear()
+
+    def _read_slot(self, slot: np.ndarray, retries: int = 100) -> bool:
+        """Copy a consistent snapshot of `slot` into `self._read`."""
+        for _ in range(retries):
+            seq = int(slot["seq"])
+            if seq & 1:
+                continue
+            self._read[...] = slot
+            if int(slot["seq"]) == seq:
+                return True
+        return False
+
+
+def parse_stream(value: str, index: int) -> StreamConfig:
+    """Parses `[name=]kind[:target]`, e.g. `desk1=webcam:0` or `video:clip.mp4`."""
+    name, _, spec = value.rpartition("=")
+    kind, _, target = spec.partition(":")
+    return StreamConfig(name or f"{kind}{index}", kind, target or None)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Monitor posture on several cameras, one worker process per camera"
+    )
+    parser.add_argument(
+        "--stream",
+        action="append",
+        required=True,
+        help="[name=]kind[:target], e.g. desk1=webcam:0 or video:clip.mp4, repeatable",
+    )
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument(
+        "--frames", type=int, default=600, help="synthetic frames, 0 runs forever"
+    )
+    parser.add_argument("--output", help="JSONL output file, defaults to stdout")
+    parser.add_argument("--easiness", type=int, default=5)
+    parser.add_argument("--model-complexity", type=int, default=0, choices=[0, 1, 2])
+    parser.add_argument("--backend", choices=BACKENDS, default="legacy")
+    parser.add_argument(
+        "--model", help="model file of the tasks (.task) or onnx (.onnx) backend"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="onnx backend intra-op threads per stream, 0 for all cores",
+    )
+    parser.add_argument(
+        "--running-mode",
+        choices=RUNNING_MODES,
+        default="video",
+        help="tasks backend running mode",
+    )
+    parser.add_argument(
+        "--delegate", choices=DELEGATES, default="cpu", help="tasks backend delegate"
+    )
+    parser.add_argument("--summary-every", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    if args.backend != "legacy" and not args.model:
+        parser.error(f"--backend {args.backend} requires --model")
+
+    streams = [
+        parse_stream(value, i)._replace(
+            fps=args.fps,
+            frames=args.frames or None,
+            backend=args.backend,
+            model=args.model,
+            threads=args.threads,
+            running_mode=args.running_mode,
+            delegate=args.delegate,
+        )
+        for i, value in enumerate(args.stream)
+    ]
+    service = MultiCameraService(
+        streams, easiness=args.easiness, model_complexity=args.model_complexity
+    )
+    writer = JsonlWriter(args.output)
+    service.start()
+    last_summary = time.monotonic()
+    try:
+        while service.running:
+            for event in service.poll():
+                writer.write(event)
+            now = time.monotonic()
+            if args.summary_every and now - last_summary >= args.summary_every:
+                last_summary = now
+                for record in service.summary():
+                    writer.write(record)
+            time.sleep(0.01)
+        for event in service.poll():
+            writer.write(event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        for record in service.summary():
+            writer.write(record)
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
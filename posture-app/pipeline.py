@@ -0,0 +1,362 @@
+import threading
+import time
+from collections import deque
+
+from pose_utils import calculate_posture_metrics, inference_counter, PostureMetrics
+from backends import PoseBackend, as_backend
+from posture_boolean import is_standing
+from scheduler import AdaptiveScheduler
+from posture_clock import RateMeter
+from roi import RoiTracker
+from landmark_filter import LandmarkFilter
+from telemetry import registry
+from frame_pool import FramePool
+
+frames_captured = registry.counter(
+    "posture_frames_captured_total", "Frames read from the camera"
+)
+frames_allocated = registry.counter(
+    "posture_frame_buffers_allocated_total",
+    "Captured frames that needed a new buffer instead of a pooled one",
+)
+frames_processed = registry.counter(
+    "posture_frames_processed_total", "Frames scored, inferred or reused"
+)
+frames_inferred = registry.counter(
+    "posture_frames_inferred_total", "Frames run through pose inference"
+)
+frames_dropped = registry.counter(
+    "posture_frames_dropped_total", "Frames replaced by a newer one before being read"
+)
+inference_seconds = registry.histogram(
+    "posture_inference_seconds", "Color conversion and pose inference per frame"
+)
+metrics_seconds = registry.histogram(
+    "posture_metrics_seconds",
+    "Landmark extraction, smoothing, standing detection and posture metrics per frame",
+)
+
+
+class LatestQueue:
+    """
+    ### Bounded queue where the newest item wins
+
+    When the queue is full, putting a new item drops the oldest unread one
+    instead of blocking the producer. Used between pipeline stages so a slow
+    consumer always sees the freshest frame and never a backlog of stale ones.
+    `on_drop` is called with every dropped item, e.g. to return its frame
+    buffer to a :class:`frame_pool.FramePool`.
+
+    Example:
+    `frames = LatestQueue(maxsize=1)`
+    `frames.put(packet)`
+    `packet = frames.get(timeout=0.1)`
+    """
+
+    def __init__(self, maxsize: int = 1, on_drop=None) -> None:
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item) -> bool:
+        """Returns True if an unread item was dropped to make room."""
+        oldest = None
+        with self._cond:
+            dropped = len(self._items) == self._items.maxlen
+            if dropped:
+                self.dropped += 1
+                oldest = self._items[0]
+            self._items.append(item)
+            self._cond.notify()
+        if dropped and self.on_drop is not None:
+            self.on_drop(oldest)
+        return dropped
+
+    def get(self, timeout: float | None = None):
+        """Returns the oldest unread item, or None if nothing arrived in time."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+
+class FramePacket:
+    """A captured frame and the monotonic time it was read from the camera."""
+
+    __slots__ = ("frame_id", "image", "captured_at")
+
+    def __init__(self, frame_id: int, image, captured_at: float) -> None:
+        self.frame_id = frame_id
+        self.image = image
+        self.captured_at = captured_at
+
+
+class PoseResult:
+    """
+    The output of the inference worker for a single frame.
+
+    `metrics` is None when no pose was detected (or the landmarks were degenerate).
+    `inferred` is False when the scheduler skipped inference and the metrics
+    were reused from the last inferred frame.
+    """
+
+    __slots__ = (
+        "frame_id",
+        "image",
+        "metrics",
+        "standing",
+        "inferred",
+        "captured_at",
+        "processed_at",
+    )
+
+    def __init__(
+        self,
+        packet: FramePacket,
+        metrics: PostureMetrics | None,
+        standing: bool,
+        processed_at: float,
+        inferred: bool = True,
+    ) -> None:
+        self.frame_id = packet.frame_id
+        self.image = packet.image
+        self.metrics = metrics
+        self.standing = standing
+        self.inferred = inferred
+        self.captured_at = packet.captured_at
+        self.processed_at = processed_at
+
+    @property
+    def latency(self) -> float:
+        """Seconds between the frame being captured and now."""
+        return time.monotonic() - self.captured_at
+
+
+class CaptureThread(threading.Thread):
+    """
+    ### Reads frames from a cv2.VideoCapture as fast as the camera delivers them
+
+    Frames are read into buffers from the :class:`frame_pool.FramePool` and
+    pushed into a :class:`LatestQueue`; if inference has fallen behind the
+    older frame is dropped. Sets `error` and stops when a read fails.
+    """
+
+    def __init__(
+        self,
+        cap,
+        frames: LatestQueue,
+        stop_event: threading.Event,
+        pool: FramePool | None = None,
+    ) -> None:
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.pool = pool or FramePool()
+        self.frames = frames
+        self.stop_event = stop_event
+        self.captured = 0
+        self.error = None
+        self.rate = RateMeter()
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            allocated = self.pool.allocated
+            success, image = self.pool.read(self.cap)
+            if not success:
+                self.error = "Error reading image, plugin your camera and restart app"
+                self.stop_event.set()
+                break
+            now = time.monotonic()
+            self.rate.tick(now)
+            self.captured += 1
+            frames_captured.inc()
+            if self.pool.allocated != allocated:
+                frames_allocated.inc()
+            if self.frames.put(FramePacket(self.captured, image, now)):
+                frames_dropped.inc()
+
+
+class InferenceWorker(threading.Thread):
+    """
+    ### Runs pose inference on the newest captured frame
+
+    Takes frames from the capture queue, runs them through the
+    :class:`backends.PoseBackend` (a bare legacy Pose is wrapped), computes the posture metrics and standing state,
+    and pushes :class:`PoseResult`s into the result queue for the GUI thread.
+    Every inferred frame is also passed to the session recorder, if one is set.
+
+    The :class:`AdaptiveScheduler` decides which frames are inferred; skipped
+    frames reuse the last metrics and standing state. The :class:`roi.RoiTracker`
+    crops inferred frames to the region around the previous pose, and the
+    :class:`landmark_filter.LandmarkFilter` smooths the landmarks before scoring.
+    """
+
+    def __init__(
+        self,
+        backend: PoseBackend,
+        frames: LatestQueue,
+        results: LatestQueue,
+        stop_event: threading.Event,
+        scheduler: AdaptiveScheduler | None = None,
+        roi: RoiTracker | None = None,
+    ) -> None:
+        super().__init__(name="inference", daemon=True)
+        self.backend = as_backend(backend)
+        self.frames = frames
+        self.results = results
+        self.stop_event = stop_event
+        self.processed = 0
+        self.recorder = None
+        self.recorder_lock = threading.Lock()
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.roi = roi or RoiTracker()
+        self.smoother = LandmarkFilter()
+        self.inferred = 0
+        # measured rate of inferred frames
+        self.rate = RateMeter()
+
+    def run(self) -> None:
+        metrics, standing = None, True
+        while not self.stop_event.is_set():
+            packet = self.frames.get(timeout=0.1)
+            if packet is None:
+                continue
+            if not self.scheduler.should_infer(packet.captured_at):
+                self.processed += 1
+                frames_processed.inc()
+                if self.results.put(
+                    PoseResult(
+                        packet, metrics, standing, time.monotonic(), inferred=False
+                    )
+                ):
+                    frames_dropped.inc()
+                continue
+            inference_counter.start_frame()
+            crop, box = self.roi.crop(packet.image)
+            start = time.perf_counter()
+            landmarks = self.backend.detect(crop, packet.captured_at)
+            inferred_at = time.perf_counter()
+            inference_seconds.observe(inferred_at - start)
+            height, width = packet.image.shape[:2]
+            landmarks = self.roi.to_full_frame(landmarks, box, width, height)
+            landmarks = self.smoother.apply(landmarks, packet.captured_at)
+            standing = is_standing(landmarks)
+            self.roi.update(landmarks, standing)
+            try:
+                metrics = calculate_posture_metrics(landmarks, width, height)
+            except (ValueError, ZeroDivisionError):
+                # degenerate landmarks (e.g. a shoulder on the frame edge)
+                metrics = None
+            metrics_seconds.observe(time.perf_counter() - inferred_at)
+            self.scheduler.observe(landmarks, standing, packet.captured_at)
+            self.inferred += 1
+            frames_inferred.inc()
+            self.rate.tick()
+            with self.recorder_lock:
+                if self.recorder is not None:
+                    self.recorder.record(time.time(), landmarks, metrics, standing)
+            self.processed += 1
+            frames_processed.inc()
+            if self.results.put(
+                PoseResult(packet, metrics, standing, time.monotonic())
+            ):
+                frames_dropped.inc()
+
+
+class PosturePipeline:
+    """
+    ### Capture -> inference -> GUI producer/consumer pipeline
+
+    Runs the blocking camera read and the pose inference on their own threads,
+    joined by single-slot latest-frame-wins queues, so neither stalls the
+    PySimpleGUI event loop and frames are dropped instead of going stale.
+    Frame buffers are pooled: dropped frames go straight back to the pool,
+    and a shown frame goes back when :meth:`latest_result` returns a newer one.
+
+    Example:
+    `pipeline = PosturePipeline(cap, create_backend("legacy"))`
+    `pipeline.start()`
+    `result = pipeline.latest_result()`
+    `pipeline.stop()`
+    """
+
+    def __init__(
+        self, cap, backend: PoseBackend, scheduler: AdaptiveScheduler | None = None
+    ) -> None:
+        self.stop_event = threading.Event()
+        self.pool = FramePool()
+        self.frames = LatestQueue(
+            maxsize=1, on_drop=lambda packet: self.pool.release(packet.image)
+        )
+        self.results = LatestQueue(
+            maxsize=1, on_drop=lambda result: self.pool.release(result.image)
+        )
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.capture = CaptureThread(cap, self.frames, self.stop_event, self.pool)
+        self.worker = InferenceWorker(
+            backend, self.frames, self.results, self.stop_event, self.scheduler
+        )
+        # the result the GUI is showing, its frame is drawn on until the next one
+        self._shown = None
+
+    def start(self) -> None:
+        self.capture.start()
+        self.worker.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Stop both threads. Waits up to `timeout` seconds for the worker to
+        finish its current frame; a camera read that hangs is given up on
+        after a second.
+
+        Returns True if the worker stopped, so the backend can be closed
+        safely. False means inference hangs (e.g. a stuck GPU delegate); the
+        backend must be left open, the daemon thread ends with the process.
+        """
+        self.stop_event.set()
+        self.capture.join(timeout=1)
+        self.worker.join(timeout=timeout)
+        recorder = self.set_recorder(None)
+        if recorder is not None:
+            recorder.close()
+        return not self.worker.is_alive()
+
+    def set_recorder(self, recorder):
+        """
+        Start (or stop, with None) recording processed frames to a
+        :class:`session_recorder.SessionRecorder`. Returns the previous recorder,
+        which the caller is responsible for closing.
+        """
+        with self.worker.recorder_lock:
+            previous, self.worker.recorder = self.worker.recorder, recorder
+        return previous
+
+    @property
+    def error(self) -> str | None:
+        return self.capture.error
+
+    def latest_result(self) -> PoseResult | None:
+        """
+        Returns the newest unread result without blocking, or None. The
+        result's image stays valid until a later call returns a newer result.
+        """
+        result = self.results.get_nowait()
+        if result is not None:
+            if self._shown is not None:
+                self.pool.release(self._shown.image)
+            self._shown = result
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "captured": self.capture.captured,
+            "processed": self.worker.processed,
+            "inferred": self.worker.inferred,
+            "dropped": self.frames.dropped + self.results.dropped,
+            "allocated": self.pool.allocated,
+        }
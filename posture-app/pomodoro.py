@@ -0,0 +1,222 @@
+import json
+import os
+import time
+
+WORK = "Timer"
+SHORT_BREAK = "Short Break"
+LONG_BREAK = "Long Break"
+DONE = "Done"
+
+# one work cycle, the phase names match the labels used in the GUI
+CYCLE = (WORK, SHORT_BREAK, WORK, SHORT_BREAK, WORK, LONG_BREAK, DONE)
+BREAKS = (SHORT_BREAK, LONG_BREAK)
+
+DEFAULT_DURATIONS = {WORK: 25 * 60, SHORT_BREAK: 3 * 60, LONG_BREAK: 15 * 60}
+
+
+class PomodoroTimer:
+    """
+    ### Deadline based Pomodoro state machine
+
+    A running phase is stored as the wall-clock time it ends, so nothing has
+    to be counted per frame: the remaining time is computed on demand and
+    :attr:`next_deadline` tells the caller when the next transition happens.
+    The state is written to `state_path` on every change and restored from it,
+    so a cycle survives restarting the app. No GUI code; drive it from
+    :class:`gui_functions.Timer`, or from tests with an injected clock.
+
+    Args:
+    * durations: seconds per phase, keyed by :data:`WORK`, :data:`SHORT_BREAK`, :data:`LONG_BREAK`
+    * state_path: JSON file the state is persisted to, None to keep it in memory
+    * clock: wall-clock time source (deadlines must stay valid across restarts)
+
+    Example:
+    `pomodoro = PomodoroTimer(state_path="pomodoro.json")`
+    `pomodoro.start()`
+    `pomodoro.tick()`
+    `print(pomodoro.display())`
+    """
+
+    def __init__(
+        self,
+        durations: dict[str, float] | None = None,
+        state_path: str | None = None,
+        clock=time.time,
+    ) -> None:
+        self.durations = dict(DEFAULT_DURATIONS)
+        if durations:
+            self.durations.update(durations)
+        self.state_path = state_path
+        self.clock = clock
+        self._reset_state()
+        if state_path and os.path.exists(state_path):
+            self.load()
+
+    def _reset_state(self) -> None:
+        # index into CYCLE of the current phase, -1 before the first one
+        self.index = -1
+        self.running = False
+        self.paused = False
+        self.deadline = None
+        # seconds left in the current phase while paused
+        self.remaining_at_pause = 0.0
+
+    @property
+    def phase(self) -> str | None:
+        return CYCLE[self.index] if self.index >= 0 else None
+
+    @property
+    def next_phase(self) -> str:
+        return CYCLE[(self.index + 1) % len(CYCLE)]
+
+    @property
+    def done(self) -> bool:
+        return self.phase == DONE
+
+    @property
+    def next_deadline(self) -> float | None:
+        """Wall-clock time the running phase ends, None when nothing is running."""
+        return self.deadline if self.running else None
+
+    def remaining(self, now: float | None = None) -> float:
+        """Seconds left in the current phase."""
+        if self.running:
+            now = self.clock() if now is None else now
+            return max(self.deadline - now, 0.0)
+        if self.paused:
+            return self.remaining_at_pause
+        return 0.0
+
+    def display(self, now: float | None = None) -> str:
+        return time.strftime("%H:%M:%S", time.gmtime(self.remaining(now)))
+
+    def set_durations(self, work: float, short_break: float, long_break: float) -> None:
+        """Set the phase lengths in minutes, raises ValueError for invalid values."""
+        minutes = {WORK: work, SHORT_BREAK: short_break, LONG_BREAK: long_break}
+        for phase, value in minutes.items():
+            value = float(value)
+            if value <= 0:
+                raise ValueError(f"{phase} must be a positive number of minutes")
+            self.durations[phase] = value * 60
+
+    def start(self, now: float | None = None) -> bool:
+        """Start the next phase if nothing is running or paused. Returns True if it started."""
+        if self.running or self.paused:
+            return False
+        self.advance(now)
+        return True
+
+    def advance(self, now: float | None = None) -> str:
+        """Skip to the next phase and start it, wrapping around after :data:`DONE`."""
+        now = self.clock() if now is None else now
+        self.index = (self.index + 1) % len(CYCLE)
+        self.paused = False
+        self.remaining_at_pause = 0.0
+        if self.done:
+            self.running = False
+            self.deadline = None
+        else:
+            self.running = True
+            self.deadline = now + self.durations[self.phase]
+        self.save()
+        return self.phase
+
+    def toggle_pause(self, now: float | None = None) -> None:
+        now = self.clock() if now is None else now
+        if self.running:
+            self.remaining_at_pause = self.remaining(now)
+            self.running = False
+            self.paused = True
+            self.deadline = None
+        elif self.paused:
+            self.running = True
+            self.paused = False
+            self.deadline = now + self.remaining_at_pause
+            self.remaining_at_pause = 0.0
+        self.save()
+
+    def reset(self) -> None:
+        self._reset_state()
+        self.save()
+
+    def tick(self, now: float | None = None) -> bool:
+        """
+        ### Finish the running phase once its deadline has passed
+
+        Returns:
+        * True if a phase finished
+        """
+        if not self.running:
+            return False
+        now = self.clock() if now is None else now
+        if now < self.deadline:
+            return False
+        self.running = False
+        self.deadline = None
+        self.save()
+        return True
+
+    def on_posture(self, standing: bool, now: float | None = None) -> bool:
+        """
+        ### Auto-advance from standing/sitting signals
+
+        Standing up while idle starts the next break, sitting down while
+        idle starts the next work phase.
+
+        Returns:
+        * True if a phase was started
+        """
+        self.tick(now)
+        if self.running or self.paused:
+            return False
+        if standing and self.next_phase in BREAKS:
+            self.advance(now)
+            return True
+        if not standing and self.next_phase == WORK:
+            self.advance(now)
+            return True
+        return False
+
+    def seconds_until_change(self, now: float | None = None) -> float | None:
+        """Seconds until the displayed time or the phase changes, None when idle."""
+        if not self.running:
+            return None
+        remaining = self.remaining(now)
+        return min(remaining, remaining % 1.0 or 1.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "running": self.running,
+            "paused": self.paused,
+            "deadline": self.deadline,
+            "remaining_at_pause": self.remaining_at_pause,
+            "durations": self.durations,
+        }
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temp_path, self.state_path)
+
+    def load(self) -> None:
+        """Restore the state saved in `state_path`; an unreadable file starts fresh."""
+        try:
+            with open(self.state_path) as file:
+                state = json.load(file)
+            self.index = int(state["index"])
+            self.running = bool(state["running"])
+            self.paused = bool(state["paused"])
+            self.deadline = state["deadline"]
+            self.remaining_at_pause = float(state["remaining_at_pause"])
+            self.durations.update(state.get("durations", {}))
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset_state()
+            return
+        if not -1 <= self.index < len(CYCLE) or (self.running and not self.deadline):
+            self._reset_state()
+        # a phase that ended while the app was closed is finished
+        self.tick()
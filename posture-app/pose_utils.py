@@ -1,130 +1,233 @@
-import mediapipe as mp
 import math as m
+from typing import TYPE_CHECKING
+
 import cv2
+import numpy as np
+
+from frame_pool import RgbBuffer
+
+if TYPE_CHECKING:
+    # only for annotations, importing mediapipe is slow and left to whoever builds the Pose
+    import mediapipe as mp
 
 
-def calculate_posture_metrics(pose:mp.solutions.pose.Pose,
-                              image:cv2.Mat) -> dict[str,float]:
+class InferenceCounter:
     """
-    ### Capture a snapshot of the user's posture and return key metrics in a dictionary format.
+    ### Counts pose inferences and color conversions per captured frame.
 
-    Args:
-    * pose: (mediapipe pose object: mp.solutions.pose.Pose())
-    * image: (cv2 image object, see :func:`process_frame`)
+    Used to verify the single-inference-per-frame pipeline: once a frame has
+    been processed `frame_inferences` and `frame_conversions` should both be 1.
 
-    Returns:
-    * metrics: a dictionary containing landmark coordinates, and calculated offsets, torso/neck inclinations
+    Example:
+    `inference_counter.start_frame()`
+    `results, image = process_frame(image, pose)`
+    `assert inference_counter.frame_inferences == 1`
+    """
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.inferences = 0
+        self.color_conversions = 0
+        self.frame_inferences = 0
+        self.frame_conversions = 0
+
+    def start_frame(self) -> None:
+        """Reset the per-frame counts for a newly captured frame."""
+        self.frames += 1
+        self.frame_inferences = 0
+        self.frame_conversions = 0
+
+    def count_inference(self) -> None:
+        self.inferences += 1
+        self.frame_inferences += 1
+
+    def count_conversion(self) -> None:
+        self.color_conversions += 1
+        self.frame_conversions += 1
+
+    def per_frame(self) -> tuple[float, float]:
+        """Returns the average (inferences, color conversions) per frame so far."""
+        if not self.frames:
+            return 0.0, 0.0
+        return self.inferences / self.frames, self.color_conversions / self.frames
+
+
+inference_counter = InferenceCounter()
+
+
+# mediapipe PoseLandmark indices, used directly to index the landmark array
+LANDMARK_COUNT = 33
+LEFT_EYE = 2
+RIGHT_EYE = 5
+LEFT_EAR = 7
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+
+# rows of the landmark array used by the posture metrics, and their (x, y, z) pixel order
+_METRIC_LANDMARKS = np.array([LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_EAR, LEFT_HIP])
+
+
+class LandmarkBuffer:
+    """
+    ### Preallocated (33, 4) float32 array of x, y, z, visibility per landmark
+
+    The buffer is reused across frames so extracting landmarks does not
+    allocate. Owned by a single thread; copy :attr:`array` before handing it
+    to another one.
 
     Example:
-    `metrics = snapshot(pose, image)`
+    `buffer = LandmarkBuffer()`
+    `landmarks = buffer.fill(results.pose_landmarks)`
+    `metrics = calculate_posture_metrics(landmarks, w, h)`
     """
-    h, w = image.shape[:2]
 
-    results, image = process_frame(image, pose)
+    def __init__(self) -> None:
+        self.array = np.zeros((LANDMARK_COUNT, 4), dtype=np.float32)
 
-    lm = results.pose_landmarks
-    if lm is None:
-        return None
+    def fill(self, pose_landmarks) -> np.ndarray | None:
+        """
+        Copy results.pose_landmarks into the buffer in a single pass.
 
-    mp_landmarks = mp.solutions.pose.PoseLandmark
+        Returns the buffer, or None if no landmarks were detected.
+        """
+        if pose_landmarks is None:
+            return None
+        self.array[:] = [
+            (lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark
+        ]
+        return self.array
 
-    # Calculate posture coordinates
-    l_shldr_x, l_shldr_y, l_shldr_z = _get_landmark_coordinates(
-        lm, mp_landmarks.LEFT_SHOULDER, w, h, calc_z=True
-    )
-    r_shldr_x, r_shldr_y, r_shldr_z = _get_landmark_coordinates(
-        lm, mp_landmarks.RIGHT_SHOULDER, w, h, calc_z=True
-    )
-    l_ear_x, l_ear_y, l_ear_z = _get_landmark_coordinates(
-        lm, mp_landmarks.LEFT_EAR, w, h, calc_z=True
+
+class PostureMetrics:
+    """
+    ### Landmark pixel coordinates and posture measurements for a single frame
+
+    Supports `metrics["closeness"]` style access as well as attributes, and
+    :meth:`to_record` for packing into a `METRICS_DTYPE` structured array.
+    """
+
+    __slots__ = (
+        "l_shldr_x",
+        "l_shldr_y",
+        "r_shldr_x",
+        "r_shldr_y",
+        "l_ear_x",
+        "l_ear_y",
+        "l_hip_x",
+        "l_hip_y",
+        "shldr_distance",
+        "neck_inclination",
+        "torso_inclination",
+        "closeness",
+        "shldr_level",
     )
-    l_hip_x, l_hip_y = _get_landmark_coordinates(lm, mp_landmarks.LEFT_HIP, w, h)
 
-    # Calculate distance between left shoulder and right shoulder points
-    shldr_distance = _findDistance(l_shldr_x, l_shldr_y, r_shldr_x, r_shldr_y)
+    def __init__(self, **values) -> None:
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+    def as_dict(self) -> dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_record(self) -> tuple:
+        """Field values in `METRICS_DTYPE` order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
 
-    # Calculate angles
-    neck_inclination = _findAngle(l_shldr_x, l_shldr_y, l_ear_x, l_ear_y)
-    torso_inclination = _findAngle(l_hip_x, l_hip_y, l_shldr_x, l_shldr_y)
 
-    return {
-        "l_shldr_x": l_shldr_x,
-        "l_shldr_y": l_shldr_y,
-        # "l_shldr_z": l_shldr_z,
-        "r_shldr_x": r_shldr_x,
-        "r_shldr_y": r_shldr_y,
-        # "r_shldr_z": r_shldr_z,
-        "l_ear_x": l_ear_x,
-        "l_ear_y": l_ear_y,
-        # "l_ear_z": l_ear_z,
-        "l_hip_x": l_hip_x,
-        "l_hip_y": l_hip_y,
-        "shldr_distance": shldr_distance,
-        "neck_inclination": neck_inclination,
-        "torso_inclination": torso_inclination,
-        "closeness": abs(
-            (l_shldr_z + r_shldr_z + l_ear_z) / 3
-        ),  # arithmetic mean of shldr + ear z's
-        "shldr_level": abs(l_shldr_y - r_shldr_y),
-    }
-
-def process_frame(image:cv2.Mat, pose:mp.solutions.pose.Pose)-> tuple[mp.solutions.pose.PoseLandmark, cv2.Mat]:
+METRICS_DTYPE = np.dtype([(name, "<f4") for name in PostureMetrics.__slots__])
+
+
+def calculate_posture_metrics(landmarks:np.ndarray,
+                              image_width:int,
+                              image_height:int) -> PostureMetrics:
     """
-    ### Process the frame to detect pose and calculate metrics.
+    ### Return key posture metrics from already extracted landmarks.
+
+    Does not run pose inference; pass the landmark array filled from the
+    results of :func:`process_frame` so every frame is only processed once.
 
     Args:
-    * image(Any cv2 image object)
-    * pose([mediapipe] mp.solutions.pose.Pose() object)
+    * landmarks: (33, 4) landmark array from :meth:`LandmarkBuffer.fill`
+    * image_width: width of the processed frame in pixels
+    * image_height: height of the processed frame in pixels
 
     Returns:
-    * results: returns mp.pose processed image data
-    * image: returns the same frame
+    * metrics: :class:`PostureMetrics` with landmark coordinates, and calculated offsets, torso/neck inclinations
+    * None: if no landmarks were detected
 
     Example:
     `results, image = process_frame(image, pose)`
+    `landmarks = buffer.fill(results.pose_landmarks)`
+    `metrics = calculate_posture_metrics(landmarks, w, h)`
     """
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    results = pose.process(image_rgb)
-    return results, cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+    if landmarks is None:
+        return None
+
+    w, h = image_width, image_height
 
+    # Calculate posture coordinates, z is scaled by the width like mediapipe's x
+    points = landmarks[_METRIC_LANDMARKS]
+    (
+        (l_shldr_x, l_shldr_y, l_shldr_z),
+        (r_shldr_x, r_shldr_y, r_shldr_z),
+        (l_ear_x, l_ear_y, l_ear_z),
+        (l_hip_x, l_hip_y, _),
+    ) = (points[:, :3] * (w, h, w)).astype(int).tolist()
 
-def _get_landmark_coordinates(
-    landmarks:any, landmark_name:any, image_width:int, image_height:int, calc_z=False
-):
+    # Calculate distance between left shoulder and right shoulder points
+    shldr_distance = _findDistance(l_shldr_x, l_shldr_y, r_shldr_x, r_shldr_y)
+
+    # Calculate angles
+    neck_inclination = _findAngle(l_shldr_x, l_shldr_y, l_ear_x, l_ear_y)
+    torso_inclination = _findAngle(l_hip_x, l_hip_y, l_shldr_x, l_shldr_y)
+
+    return PostureMetrics(
+        l_shldr_x=l_shldr_x,
+        l_shldr_y=l_shldr_y,
+        r_shldr_x=r_shldr_x,
+        r_shldr_y=r_shldr_y,
+        l_ear_x=l_ear_x,
+        l_ear_y=l_ear_y,
+        l_hip_x=l_hip_x,
+        l_hip_y=l_hip_y,
+        shldr_distance=shldr_distance,
+        neck_inclination=neck_inclination,
+        torso_inclination=torso_inclination,
+        # arithmetic mean of shldr + ear z's
+        closeness=abs((l_shldr_z + r_shldr_z + l_ear_z) / 3),
+        shldr_level=abs(l_shldr_y - r_shldr_y),
+    )
+
+def process_frame(image:cv2.Mat,
+                  pose:"mp.solutions.pose.Pose",
+                  rgb:RgbBuffer | None = None)-> tuple["mp.solutions.pose.PoseLandmark", cv2.Mat]:
     """
-    ### Calculate a given landmarks x and y values relative to frames resolution
+    ### Process the frame to detect pose and calculate metrics.
 
     Args:
-    * landmarks: () accepts results.pose_landmarks
-    * landmark_name: accepts lmPose.* get the name of the desired landmark to be checked
-    * image_width: width of the image
-    * image_height: height of the image
+    * image(Any cv2 image object)
+    * pose([mediapipe] mp.solutions.pose.Pose() object)
+    * rgb: optional :class:`frame_pool.RgbBuffer` the model input is converted into, instead of a new array
 
     Returns:
-    * x, y : coordinates calculated from the pixel position of landmark
-    * None, None: in the case of exceptions
+    * results: returns mp.pose processed image data
+    * image: returns the same (untouched BGR) frame
 
     Example:
-    lm = results.pose_landmarks
-    lmPose = mp_pose.PoseLandmark
-
-    l_shldr_x, l_shldr_y = get_landmark_coordinates(lm, lmPose.LEFT_SHOULDER, w, h)
+    `results, image = process_frame(image, pose)`
     """
-    try:
-        x = int(landmarks.landmark[landmark_name].x * image_width)
-        y = int(landmarks.landmark[landmark_name].y * image_height)
-        if calc_z:
-            z = int(landmarks.landmark[landmark_name].z * image_width)
-            return x, y, z
-        return x, y
-    except IndexError:
-        # Handle case where the landmark is not found
-        return None, None
-    except AttributeError:
-        # Handle case where landmarks are not properly initialized
-        return None, None
-
-
+    if rgb is None:
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    else:
+        image_rgb = rgb.convert(image)
+    inference_counter.count_conversion()
+    results = pose.process(image_rgb)
+    inference_counter.count_inference()
+    return results, image
 
 
 def _findDistance(x1, y1, x2, y2) -> float:
@@ -1,44 +1,37 @@
-import mediapipe as mp
+from pose_utils import LEFT_EYE, RIGHT_EYE, LEFT_SHOULDER, RIGHT_SHOULDER
 
-mp_pose = mp.solutions.pose
 
-
-def is_standing(pose_landmarks, standing_threshold=0.08) -> bool:
+def is_standing(landmarks, standing_threshold=0.08) -> bool:
     """
     Returns True if user is standing or out of frame
 
     Args:
-    * pose_landmarks: (frozenset) accepts results.pose_landmarks. it is a list of pose landmarks detected in Mediapipe package
+    * landmarks: (np.ndarray) (33, 4) landmark array from pose_utils.LandmarkBuffer.fill, or None if no pose was detected
     * standing_threshold: (float) decimal number to determine what is standing. Default = 0.08
 
     Returns:
     * Bool
 
     Example:
-    * `standing = is_standing(results.pose_landmarks)`
+    * `standing = is_standing(buffer.fill(results.pose_landmarks))`
     """
-    standing = True
-    if not pose_landmarks:
-        return standing
-    try:
-        # Extract the y-coordinates of the relevant landmarks
-        left_shoulder_y = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].y
-        right_shoulder_y = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].y
-        left_eye_y = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_EYE].y
-        right_eye_y = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_EYE].y
-
-        # Calculate the average y-coordinates for shoulders and eyes
-        average_shoulder_y = (left_shoulder_y + right_shoulder_y) / 2
-        average_eye_y = (left_eye_y + right_eye_y) / 2
-
-        if average_eye_y < 0.002:
-            standing = True
-
-        if average_shoulder_y - average_eye_y > standing_threshold:
-            standing = False
-        else:
-            standing = True
-
-        return standing
-    except TypeError:
+    if landmarks is None:
         return True
+
+    # Calculate the average y-coordinates for shoulders and eyes
+    average_shoulder_y = (landmarks[LEFT_SHOULDER, 1] + landmarks[RIGHT_SHOULDER, 1]) / 2
+    average_eye_y = (landmarks[LEFT_EYE, 1] + landmarks[RIGHT_EYE, 1]) / 2
+
+    return bool(average_shoulder_y - average_eye_y <= standing_threshold)
+
+
+# default values set for offset and inclination conditions
+DEFAULT_BASELINE = {
+    "offset": 260,
+    "neck_inclination": 30,
+    "torso_inclination": 4,
+    "closeness": 420,
+    "shldr_distance": 270,
+    "shldr_level": 10,
+}
+
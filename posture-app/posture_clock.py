@@ -0,0 +1,123 @@
+import time
+
+from telemetry import registry
+
+# totals of the app's posture clock, set by whoever owns it (GUI or headless runner)
+good_seconds = registry.gauge("posture_good_seconds", "Seconds in good posture")
+bad_seconds = registry.gauge("posture_bad_seconds", "Seconds in bad posture")
+standing_seconds = registry.gauge("posture_standing_seconds", "Seconds standing")
+
+
+class RateMeter:
+    """
+    ### Measures the real rate of a repeating event (frames/sec) on the monotonic clock
+
+    Uses an exponentially weighted average of the interval between ticks so
+    the reading follows changes within a second or two without jittering.
+
+    Example:
+    `capture_rate = RateMeter()`
+    `capture_rate.tick()`
+    `print(capture_rate.fps)`
+    """
+
+    def __init__(self, smoothing: float = 0.1) -> None:
+        self.smoothing = smoothing
+        self.count = 0
+        self._last = None
+        self._interval = None
+
+    def tick(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            interval = now - self._last
+            if self._interval is None:
+                self._interval = interval
+            else:
+                self._interval += self.smoothing * (interval - self._interval)
+        self._last = now
+        self.count += 1
+
+    @property
+    def fps(self) -> float:
+        if not self._interval:
+            return 0.0
+        return 1 / self._interval
+
+
+class PostureClock:
+    """
+    ### Accumulates real elapsed good/bad/standing time
+
+    Each update attributes the wall-clock time since the previous update to
+    the posture observed at the previous update, so the totals stay correct
+    at any (or a variable) frame rate and a streak is exactly as long as the
+    time since it was first observed. Gaps longer than `max_gap` (e.g. the
+    laptop slept) only count as `max_gap`.
+
+    Attributes:
+    * good_time, bad_time: seconds since the current good/bad posture streak was first observed
+    * good_seconds, bad_seconds, standing_seconds: session totals
+
+    Example:
+    `clock = PostureClock()`
+    `clock.update(score.good, standing)`
+    `if clock.bad_time > POSTURE_WARNING_TIME: ...`
+    """
+
+    def __init__(self, max_gap: float = 1.0) -> None:
+        self.max_gap = max_gap
+        self.good_time = 0.0
+        self.bad_time = 0.0
+        self.good_seconds = 0.0
+        self.bad_seconds = 0.0
+        self.standing_seconds = 0.0
+        self.last_update = None
+        self._good = None
+        self._standing = False
+
+    def update(
+        self, good: bool | None, standing: bool, now: float | None = None
+    ) -> float:
+        """
+        ### Account for the time since the last update
+
+        Args:
+        * good: whether the current frame's posture is good, None if it was not scored (resets both streaks)
+        * standing: result of :func:`posture_boolean.is_standing`
+        * now: monotonic (or source) timestamp, defaults to time.monotonic()
+
+        Returns:
+        * the number of seconds that were accounted
+        """
+        now = time.monotonic() if now is None else now
+        dt = (
+            0.0
+            if self.last_update is None
+            else min(now - self.last_update, self.max_gap)
+        )
+        dt = max(dt, 0.0)
+        self.last_update = now
+
+        # the elapsed time belongs to the state that held since the last update
+        if self._standing:
+            self.standing_seconds += dt
+        if self._good is True:
+            self.good_seconds += dt
+        elif self._good is False:
+            self.bad_seconds += dt
+
+        if good is None:
+            self.good_time = self.bad_time = 0.0
+        elif good:
+            self.good_time = self.good_time + dt if self._good is True else 0.0
+            self.bad_time = 0.0
+        else:
+            self.bad_time = self.bad_time + dt if self._good is False else 0.0
+            self.good_time = 0.0
+        self._good = good
+        self._standing = standing
+        return dt
+
+    def reset(self) -> None:
+        self.__init__(self.max_gap)
@@ -0,0 +1,200 @@
+import numpy as np
+
+from posture_boolean import DEFAULT_BASELINE
+
+# metrics that are scored against the baseline, in column order for batch scoring
+SCORED_METRICS = ("closeness", "neck_inclination", "shldr_level")
+
+# smallest accepted deviation from a calibrated baseline, so a very steady
+# calibration does not produce bands narrower than the landmark noise
+MIN_TOLERANCE = {"closeness": 20.0, "neck_inclination": 3.0, "shldr_level": 5.0}
+
+# calibrated bands are the baseline +- (SIGMA_BASE + easiness * SIGMA_PER_EASINESS) standard deviations
+SIGMA_BASE = 1.5
+SIGMA_PER_EASINESS = 0.25
+
+SCORE_DTYPE = np.dtype(
+    [
+        ("good_closeness", "?"),
+        ("good_neck", "?"),
+        ("good_shldr_level", "?"),
+        ("good", "?"),
+    ]
+)
+
+
+class PostureScore:
+    """Per-check result of scoring a single frame, see :meth:`PostureEvaluator.score`."""
+
+    __slots__ = ("good_closeness", "good_neck", "good_shldr_level")
+
+    def __init__(
+        self, good_closeness: bool, good_neck: bool, good_shldr_level: bool
+    ) -> None:
+        self.good_closeness = good_closeness
+        self.good_neck = good_neck
+        self.good_shldr_level = good_shldr_level
+
+    @property
+    def good(self) -> bool:
+        return self.good_closeness and self.good_neck and self.good_shldr_level
+
+
+class PostureEvaluator:
+    """
+    ### Scores posture metrics against a baseline posture
+
+    Scores one frame at a time for the live app (keeping the good/bad frame
+    streak counters), or a whole array of recorded frames in one vectorized
+    call to re-score sessions against a new baseline or easiness.
+
+    With a calibration (:meth:`set_calibration`) the accepted range of each
+    metric is derived from its measured spread; without one the fixed
+    easiness multipliers are used.
+
+    Args:
+    * baseline: good posture values, defaults to `posture_boolean.DEFAULT_BASELINE`
+    * easiness: 0-10, widens the accepted range around the baseline
+    * spread: per-metric standard deviation measured by :class:`calibration.Calibration`
+
+    Example:
+    `evaluator = PostureEvaluator(easiness=5)`
+    `score = evaluator.update(metrics)`
+    `scores = evaluator.score_batch(recorded_metrics)`
+    """
+
+    def __init__(
+        self,
+        baseline: dict | None = None,
+        easiness: int = 5,
+        spread: dict | None = None,
+    ) -> None:
+        self.baseline = dict(DEFAULT_BASELINE)
+        if baseline:
+            self.baseline.update(baseline)
+        self.easiness = easiness
+        self.spread = dict(spread) if spread else None
+        self.good_frames = 0
+        self.bad_frames = 0
+        self.total_frames = 0
+
+    def bands(self) -> dict[str, tuple[float, float]]:
+        """
+        ### The open (low, high) range each scored metric must fall in to be good
+
+        Uncalibrated, equivalent to the original checks, e.g.
+        `closeness + easiness * 20 > baseline > closeness - easiness * 50`.
+        Calibrated, the baseline +- a number of standard deviations that grows
+        with easiness, never narrower than `MIN_TOLERANCE`.
+        """
+        if self.spread:
+            sigmas = SIGMA_BASE + self.easiness * SIGMA_PER_EASINESS
+            bands = {}
+            for name in SCORED_METRICS:
+                tolerance = max(
+                    sigmas * self.spread.get(name, 0.0), MIN_TOLERANCE[name]
+                )
+                bands[name] = (
+                    self.baseline[name] - tolerance,
+                    self.baseline[name] + tolerance,
+                )
+            return bands
+        e = self.easiness
+        closeness = self.baseline["closeness"]
+        neck = self.baseline["neck_inclination"]
+        shldr_level = self.baseline["shldr_level"]
+        return {
+            "closeness": (closeness - e * 20, closeness + e * 50),
+            "neck_inclination": (neck - e - 5, neck + e - 5),
+            "shldr_level": (shldr_level - e * 5, shldr_level + e * 5),
+        }
+
+    def set_baseline(self, metrics: dict) -> None:
+        """Use a frame's metrics as the new good posture baseline (drops any calibration)."""
+        self.spread = None
+        for key in (
+            "neck_inclination",
+            "torso_inclination",
+            "shldr_distance",
+            "closeness",
+            "shldr_level",
+        ):
+            self.baseline[key] = metrics[key]
+
+    def set_calibration(self, profile) -> None:
+        """Use a :class:`calibration.CalibrationProfile` as the baseline and tolerance bands."""
+        self.baseline.update(profile.baseline)
+        self.spread = dict(profile.spread)
+
+    def score(self, metrics: dict) -> PostureScore:
+        """Score a single frame's metrics without touching the frame counters."""
+        checks = [
+            low < metrics[name] < high for name, (low, high) in self.bands().items()
+        ]
+        return PostureScore(*checks)
+
+    def update(self, metrics: dict) -> PostureScore:
+        """Score a frame and update the `good_frames`/`bad_frames` streak counters."""
+        score = self.score(metrics)
+        if score.good:
+            self.bad_frames = 0
+            self.good_frames += 1
+        else:
+            self.good_frames = 0
+            self.bad_frames += 1
+        self.total_frames += 1
+        return score
+
+    def reset(self) -> None:
+        self.good_frames = 0
+        self.bad_frames = 0
+        self.total_frames = 0
+
+    def score_batch(self, metrics: np.ndarray) -> np.ndarray:
+        """
+        ### Score N frames in one vectorized call
+
+        Args:
+        * metrics: a structured array with (at least) the `SCORED_METRICS` fields,
+          or an (N, 3) array with columns in `SCORED_METRICS` order
+
+        Returns:
+        * a structured array of `SCORE_DTYPE`, one row per frame
+        """
+        metrics = np.asarray(metrics)
+        scores = np.empty(len(metrics), dtype=SCORE_DTYPE)
+        for field, (name, (low, high)) in zip(
+            ("good_closeness", "good_neck", "good_shldr_level"), self.bands().items()
+        ):
+            if metrics.dtype.names:
+                column = metrics[name]
+            else:
+                column = metrics[:, SCORED_METRICS.index(name)]
+            scores[field] = (column > low) & (column < high)
+        scores["good"] = (
+            scores["good_closeness"] & scores["good_neck"] & scores["good_shldr_level"]
+        )
+        return scores
+
+
+def streak_counts(good: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ### Vectorized equivalent of the live good_frames/bad_frames counters
+
+    Args:
+    * good: boolean array, one entry per frame
+
+    Returns:
+    * (good_frames, bad_frames): the counter values after each frame
+
+    Example:
+    `good_frames, bad_frames = streak_counts(scores["good"])`
+    """
+    good = np.asarray(good, dtype=bool)
+    index = np.arange(len(good))
+    starts = (
+        np.r_[True, good[1:] != good[:-1]] if len(good) else np.zeros(0, dtype=bool)
+    )
+    run_start = np.maximum.accumulate(np.where(starts, index, 0))
+    run_length = index - run_start + 1
+    return np.where(good, run_length, 0), np.where(good, 0, run_length)
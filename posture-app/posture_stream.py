@@ -0,0 +1,272 @@
+import argparse
+import getpass
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+
+from pomodoro import WORK, SHORT_BREAK, LONG_BREAK, DONE
+
+# every message is a header followed by `length` payload bytes; subscribers
+# skip message types they do not know, so new types can be added later.
+# Header, little-endian, 3 bytes: u8 message type, u16 payload length
+HEADER = struct.Struct("<BH")
+MSG_STATE = 1
+
+# State payload, little-endian and unpadded, 22 bytes:
+#   offset  0  f64  timestamp (time.time())
+#   offset  8  u8   flags (FLAG_*)
+#   offset  9  f32  good streak seconds
+#   offset 13  f32  bad streak seconds
+#   offset 17  u8   timer phase, an index into PHASES
+#   offset 18  f32  timer seconds left
+STATE = struct.Struct("<dBffBf")
+FLAG_DETECTED = 1
+FLAG_GOOD = 2
+FLAG_STANDING = 4
+
+# Pomodoro phase <-> the byte sent on the wire
+PHASES = (None, WORK, SHORT_BREAK, LONG_BREAK, DONE)
+
+_SEND_FLAGS = getattr(socket, "MSG_NOSIGNAL", 0)
+
+
+class PostureState(NamedTuple):
+    """One snapshot of the posture loop, as broadcast to subscribers."""
+
+    timestamp: float
+    detected: bool
+    good: bool
+    standing: bool
+    good_time: float = 0.0
+    bad_time: float = 0.0
+    timer_phase: str | None = None
+    timer_remaining: float = 0.0
+
+    def pack(self) -> bytes:
+        flags = (
+            (FLAG_DETECTED if self.detected else 0)
+            | (FLAG_GOOD if self.good else 0)
+            | (FLAG_STANDING if self.standing else 0)
+        )
+        payload = STATE.pack(
+            self.timestamp,
+            flags,
+            self.good_time,
+            self.bad_time,
+            PHASES.index(self.timer_phase),
+            self.timer_remaining,
+        )
+        return HEADER.pack(MSG_STATE, len(payload)) + payload
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> "PostureState":
+        timestamp, flags, good_time, bad_time, phase, remaining = STATE.unpack(payload)
+        return cls(
+            timestamp,
+            bool(flags & FLAG_DETECTED),
+            bool(flags & FLAG_GOOD),
+            bool(flags & FLAG_STANDING),
+            good_time,
+            bad_time,
+            PHASES[phase] if phase < len(PHASES) else None,
+            remaining,
+        )
+
+    def changed(self, other: "PostureState | None") -> bool:
+        """Whether anything but the times differs from `other`."""
+        return other is None or (
+            self.detected,
+            self.good,
+            self.standing,
+            self.timer_phase,
+        ) != (other.detected, other.good, other.standing, other.timer_phase)
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"posture-{getpass.getuser()}.sock")
+
+
+class _Subscriber:
+    """A connected client: the unsent rest of one message, and the newest unsent one."""
+
+    __slots__ = ("sock", "partial", "latest")
+
+    def __init__(self, sock: socket.socket, latest: bytes | None) -> None:
+        self.sock = sock
+        self.partial = b""
+        self.latest = latest
+
+    def flush(self) -> None:
+        """Send without blocking; raises OSError if the client went away."""
+        while True:
+            if not self.partial:
+                if self.latest is None:
+                    return
+                self.partial, self.latest = self.latest, None
+            try:
+                sent = self.sock.send(self.partial, _SEND_FLAGS)
+            except BlockingIOError:
+                return
+            self.partial = self.partial[sent:]
+
+
+class StatePublisher:
+    """
+    ### Broadcasts posture state to local subscribers over a Unix domain socket
+
+    Called from the posture loop; every socket operation is non-blocking, so
+    a stuck subscriber can never stall inference. States are snapshots, so a
+    subscriber that is not reading only gets the newest state once it catches
+    up: unsent intermediate states are dropped, never queued. New subscribers
+    get the current state right away. A state is sent when the posture,
+    standing or timer phase changes, and at least every `heartbeat` seconds.
+
+    Args:
+    * path: socket path, defaults to :func:`default_socket_path`
+    * heartbeat: longest seconds between two broadcasts
+
+    Raises:
+    * OSError: the socket cannot be bound, or the platform has no Unix sockets
+
+    Example:
+    `publisher = StatePublisher()`
+    `publisher.publish(PostureState(time.time(), True, good, standing))`
+    `publisher.close()`
+    """
+
+    def __init__(self, path: str | None = None, heartbeat: float = 1.0) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform")
+        self.path = path or default_socket_path()
+        self.heartbeat = heartbeat
+        self.subscribers = []
+        self.sent = 0
+        self.dropped = 0
+        self._last = None
+        self._last_frame = None
+        self._last_sent_at = 0.0
+        self._remove_stale_socket()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.server.listen()
+        self.server.setblocking(False)
+
+    def _remove_stale_socket(self) -> None:
+        """Remove the socket file of a crashed instance, refuse to replace a live one."""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(f"{self.path} is in use by another posture app")
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            self.subscribers.append(_Subscriber(sock, self._last_frame))
+
+    def publish(self, state: PostureState, now: float | None = None) -> bool:
+        """
+        ### Send `state` to every subscriber if it changed or a heartbeat is due
+
+        Returns:
+        * True if the state was broadcast
+        """
+        now = time.monotonic() if now is None else now
+        self._accept()
+        if not state.changed(self._last) and now - self._last_sent_at < self.heartbeat:
+            self._flush()
+            return False
+        self._last = state
+        self._last_frame = state.pack()
+        self._last_sent_at = now
+        for subscriber in self.subscribers:
+            if subscriber.latest is not None:
+                self.dropped += 1
+            subscriber.latest = self._last_frame
+        self._flush()
+        self.sent += 1
+        return True
+
+    def _flush(self) -> None:
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.flush()
+            except OSError:
+                subscriber.sock.close()
+                self.subscribers.remove(subscriber)
+
+    def close(self) -> None:
+        for subscriber in self.subscribers:
+            subscriber.sock.close()
+        self.subscribers.clear()
+        self.server.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def subscribe(path: str | None = None):
+    """
+    ### Connect to a running app and yield its :class:`PostureState`s
+
+    Blocks between states; returns when the app closes the socket.
+
+    Example:
+    `for state in subscribe(): print(state.good, state.standing)`
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path or default_socket_path())
+    buffer = b""
+    try:
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            buffer += chunk
+            while len(buffer) >= HEADER.size:
+                kind, length = HEADER.unpack_from(buffer)
+                end = HEADER.size + length
+                if len(buffer) < end:
+                    break
+                payload, buffer = buffer[HEADER.size : end], buffer[end:]
+                if kind == MSG_STATE:
+                    yield PostureState.unpack(payload)
+    finally:
+        sock.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Print the posture state of a running app as JSON lines"
+    )
+    parser.add_argument("--socket", help=f"defaults to {default_socket_path()}")
+    args = parser.parse_args(argv)
+    try:
+        for state in subscribe(args.socket):
+            print(json.dumps(state._asdict()), flush=True)
+    except OSError as e:
+        sys.exit(f"Cannot connect to the posture app: {e}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+
+import cv2
+
+# sg.Image (tkinter PhotoImage) can only decode PNG/GIF/PPM data, "jpeg" is for
+# consumers outside the GUI such as benchmarks or streaming the preview elsewhere
+PREVIEW_FORMATS = ("ppm", "png", "jpeg")
+
+
+class PreviewEncoder:
+    """
+    ### Encodes frames for the GUI preview at its own (lower) refresh rate
+
+    PNG compressing every full-size frame was one of the most expensive steps
+    in the main loop. This encoder downscales the frame, uses a cheap format
+    and only encodes when the next preview refresh is due, so posture analysis
+    keeps running at the full frame rate.
+
+    Args:
+    * fmt: one of `PREVIEW_FORMATS`. "ppm" is raw pixels and cheapest to encode
+    * quality: JPEG quality (0-100) or PNG compression level (0-9)
+    * scale: downscale factor applied before encoding (1.0 = full size)
+    * max_fps: maximum preview refreshes per second, 0 for every frame
+
+    Example:
+    `preview = PreviewEncoder(fmt="ppm", scale=0.75, max_fps=15)`
+    `if preview.due():`
+    `    window["image"].update(data=preview.encode(image))`
+    """
+
+    def __init__(
+        self,
+        fmt: str = "ppm",
+        quality: int = 80,
+        scale: float = 1.0,
+        max_fps: float = 15,
+    ) -> None:
+        if fmt not in PREVIEW_FORMATS:
+            raise ValueError(
+                f"Unknown preview format {fmt!r}, use one of {PREVIEW_FORMATS}"
+            )
+        if not 0 < scale <= 1:
+            raise ValueError("Preview scale must be in (0, 1]")
+        self.fmt = fmt
+        self.quality = quality
+        self.scale = scale
+        self.max_fps = max_fps
+        self._next_refresh = 0.0
+        self._resized = None
+
+    @property
+    def _params(self) -> list[int]:
+        if self.fmt == "jpeg":
+            return [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)]
+        if self.fmt == "png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, min(int(self.quality), 9)]
+        return []
+
+    def due(self, now: float | None = None) -> bool:
+        """Returns True (and schedules the next refresh) if a preview should be encoded now."""
+        if self.max_fps <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        if now < self._next_refresh:
+            return False
+        self._next_refresh = now + 1 / self.max_fps
+        return True
+
+    def encode(self, image) -> bytes:
+        """Downscale (into a reused buffer) and encode a BGR frame."""
+        if self.scale != 1.0:
+            h, w = image.shape[:2]
+            size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+            if self._resized is None or self._resized.shape[1::-1] != size:
+                self._resized = None
+            self._resized = cv2.resize(
+                image, size, dst=self._resized, interpolation=cv2.INTER_AREA
+            )
+            image = self._resized
+        ext = ".jpg" if self.fmt == "jpeg" else f".{self.fmt}"
+        return cv2.imencode(ext, image, self._params)[1].tobytes()
@@ -0,0 +1,150 @@
+import numpy as np
+
+from pose_utils import (
+    LEFT_EYE,
+    RIGHT_EYE,
+    LEFT_EAR,
+    LEFT_SHOULDER,
+    RIGHT_SHOULDER,
+    LEFT_HIP,
+)
+
+# landmarks the crop has to contain: everything is_standing and the metrics read
+_ROI_LANDMARKS = np.array(
+    [LEFT_EYE, RIGHT_EYE, LEFT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP]
+)
+# the shoulders anchor the crop, without them tracking counts as lost
+_ANCHOR_LANDMARKS = np.array([LEFT_SHOULDER, RIGHT_SHOULDER])
+
+
+class RoiTracker:
+    """
+    ### Crops each frame to a padded box around the previous frame's upper body
+
+    Pose inference then runs on the crop instead of the full frame, which makes
+    the color conversion and inference cheaper. Landmarks found in the crop are
+    mapped back to full-frame normalized coordinates with :meth:`to_full_frame`,
+    so everything downstream is unaware of the crop.
+
+    The crop is only moved when a tracked landmark gets within `margin` of its
+    edge, so mediapipe sees a stable input between frames. Inference falls back
+    to the full frame when no pose was found, the shoulders are not visible, or
+    the user stands up or sits down.
+
+    Args:
+    * padding: extra space around the landmark bounding box, as a fraction of its size
+    * margin: fraction of the crop size a landmark may get to an edge before the crop moves
+    * min_visibility: landmarks below this visibility are not used to place the crop
+    * max_area: crops covering more than this fraction of the frame use the full frame
+
+    Example:
+    `roi = RoiTracker()`
+    `crop, box = roi.crop(image)`
+    `results, _ = process_frame(crop, pose)`
+    `landmarks = roi.to_full_frame(buffer.fill(results.pose_landmarks), box, w, h)`
+    `roi.update(landmarks, is_standing(landmarks))`
+    """
+
+    def __init__(
+        self,
+        padding: float = 0.6,
+        margin: float = 0.1,
+        min_visibility: float = 0.5,
+        max_area: float = 0.8,
+    ) -> None:
+        self.padding = padding
+        self.margin = margin
+        self.min_visibility = min_visibility
+        self.max_area = max_area
+        self.enabled = True
+        # normalized (x0, y0, x1, y1) of the next crop, None for the full frame
+        self.box = None
+        self.cropped = 0
+        self.full_frames = 0
+        self._standing = None
+
+    def crop(self, image: np.ndarray) -> tuple[np.ndarray, tuple | None]:
+        """
+        ### Returns the part of the frame to run inference on
+
+        Returns:
+        * a view of `image` (no copy), and the (x0, y0, x1, y1) pixel box it
+          covers, or None when it is the full frame
+        """
+        if not self.enabled or self.box is None:
+            self.full_frames += 1
+            return image, None
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = self.box
+        box = (
+            int(x0 * width),
+            int(y0 * height),
+            int(np.ceil(x1 * width)),
+            int(np.ceil(y1 * height)),
+        )
+        self.cropped += 1
+        return image[box[1] : box[3], box[0] : box[2]], box
+
+    @staticmethod
+    def to_full_frame(
+        landmarks: np.ndarray | None, box: tuple | None, width: int, height: int
+    ) -> np.ndarray | None:
+        """
+        ### Map landmarks normalized to a crop back to the full frame, in place
+
+        z is normalized by the image width like x, so it is rescaled by the
+        crop width over the frame width.
+        """
+        if landmarks is None or box is None:
+            return landmarks
+        x0, y0, x1, y1 = box
+        crop_width, crop_height = x1 - x0, y1 - y0
+        landmarks[:, 0] *= crop_width / width
+        landmarks[:, 0] += x0 / width
+        landmarks[:, 1] *= crop_height / height
+        landmarks[:, 1] += y0 / height
+        landmarks[:, 2] *= crop_width / width
+        return landmarks
+
+    def update(self, landmarks: np.ndarray | None, standing: bool) -> None:
+        """
+        ### Place the next frame's crop from this frame's full-frame landmarks
+
+        Args:
+        * landmarks: (33, 4) landmark array in full-frame coordinates, or None
+        * standing: result of :func:`posture_boolean.is_standing`
+        """
+        transition = self._standing is not None and standing != self._standing
+        self._standing = standing
+        if landmarks is None or transition:
+            self.box = None
+            return
+
+        if (landmarks[_ANCHOR_LANDMARKS, 3] < self.min_visibility).any():
+            self.box = None
+            return
+        points = landmarks[_ROI_LANDMARKS]
+        points = points[points[:, 3] >= self.min_visibility, :2]
+
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            margin_x = (x1 - x0) * self.margin
+            margin_y = (y1 - y0) * self.margin
+            inside = (
+                (points[:, 0] >= x0 + margin_x).all()
+                and (points[:, 0] <= x1 - margin_x).all()
+                and (points[:, 1] >= y0 + margin_y).all()
+                and (points[:, 1] <= y1 - margin_y).all()
+            )
+            if inside:
+                return
+
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        pad = (high - low) * self.padding
+        x0, y0 = np.clip(low - pad, 0.0, 1.0)
+        x1, y1 = np.clip(high + pad, 0.0, 1.0)
+        if (x1 - x0) * (y1 - y0) > self.max_area or x1 <= x0 or y1 <= y0:
+            self.box = None
+        else:
+            self.box = (float(x0), float(y0), float(x1), float(y1))
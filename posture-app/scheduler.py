@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+from pose_utils import (
+    LANDMARK_COUNT,
+    LEFT_EYE,
+    RIGHT_EYE,
+    LEFT_EAR,
+    LEFT_SHOULDER,
+    RIGHT_SHOULDER,
+    LEFT_HIP,
+)
+
+# landmarks whose movement wakes the scheduler back up
+_TRACKED_LANDMARKS = np.array(
+    [LEFT_EYE, RIGHT_EYE, LEFT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP]
+)
+
+
+class AdaptiveScheduler:
+    """
+    ### Decides which captured frames get full pose inference
+
+    While the landmarks are stable and posture is good the interval between
+    inferences backs off from `min_interval` towards `max_interval`. Any
+    movement, a posture violation, a standing/sitting transition or a lost
+    pose snaps it straight back to `min_interval`. Frames in between reuse the
+    last landmarks.
+
+    `max_interval` is capped at a fifth of `warning_time`, so a violation that
+    starts while backed off is picked up well before it should raise an alert.
+
+    Args:
+    * min_interval: seconds between inferences when active (0 = every frame)
+    * max_interval: longest gap between inferences when stable
+    * warning_time: the app's POSTURE_WARNING_TIME in seconds
+    * stable_after: seconds of stability before backing off
+    * movement_threshold: mean normalized landmark displacement counted as movement
+    * backoff: factor the interval grows by per stable inference
+
+    Example:
+    `scheduler = AdaptiveScheduler(warning_time=POSTURE_WARNING_TIME)`
+    `if scheduler.should_infer(): ... scheduler.observe(landmarks, standing)`
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        max_interval: float = 1.0,
+        warning_time: float = 5.0,
+        stable_after: float = 3.0,
+        movement_threshold: float = 0.01,
+        backoff: float = 1.5,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, min(max_interval, warning_time / 5))
+        self.stable_after = stable_after
+        self.movement_threshold = movement_threshold
+        self.backoff = backoff
+        # set from the GUI thread, read by the inference worker
+        self.posture_good = True
+        self.interval = min_interval
+        self.skipped = 0
+        self._next_due = 0.0
+        self._last_inference = float("-inf")
+        self._stable_since = None
+        self._standing = None
+        self._previous = np.zeros((LANDMARK_COUNT, 4), dtype=np.float32)
+        self._has_previous = False
+
+    def should_infer(self, now: float | None = None) -> bool:
+        """Returns True if the current frame should be run through pose inference."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_due:
+            return True
+        self.skipped += 1
+        return False
+
+    def report_posture(self, good: bool) -> None:
+        """Called with each scored frame; a violation wakes the scheduler immediately."""
+        self.posture_good = good
+        if not good:
+            self.wake()
+
+    def wake(self) -> None:
+        """
+        Reset the backoff: infer again `min_interval` after the last inference
+        (the next frame when that has passed), never faster than `min_interval`.
+        """
+        self.interval = self.min_interval
+        self._stable_since = None
+        self._next_due = self._last_inference + self.min_interval
+
+    def observe(self, landmarks, standing: bool, now: float | None = None) -> None:
+        """
+        ### Update the inference interval from a freshly inferred frame
+
+        Args:
+        * landmarks: (33, 4) landmark array, or None if no pose was detected
+        * standing: result of :func:`posture_boolean.is_standing`
+        """
+        now = time.monotonic() if now is None else now
+        self._last_inference = now
+        moved = landmarks is None or not self._has_previous
+        if landmarks is not None:
+            if self._has_previous:
+                displacement = np.abs(
+                    landmarks[_TRACKED_LANDMARKS, :2]
+                    - self._previous[_TRACKED_LANDMARKS, :2]
+                ).mean()
+                moved = displacement > self.movement_threshold
+            np.copyto(self._previous, landmarks)
+        self._has_previous = landmarks is not None
+
+        transition = self._standing is not None and standing != self._standing
+        self._standing = standing
+
+        if moved or transition or not self.posture_good or self._stable_since is None:
+            self.interval = self.min_interval
+            self._stable_since = now
+        elif now - self._stable_since >= self.stable_after:
+            self.interval = min(
+                max(self.interval, 0.05) * self.backoff, self.max_interval
+            )
+        self._next_due = now + self.interval
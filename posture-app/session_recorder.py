@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import struct
+
+import numpy as np
+
+from pose_utils import LANDMARK_COUNT, METRICS_DTYPE
+from posture_evaluator import PostureEvaluator, SCORE_DTYPE
+
+MAGIC = b"PPSESS01"
+# magic, record size in bytes
+HEADER = struct.Struct("<8sI")
+
+FLAG_DETECTED = 1
+FLAG_STANDING = 2
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("landmarks", "<f4", (LANDMARK_COUNT, 4)),
+        ("metrics", METRICS_DTYPE),
+        ("flags", "u1"),
+    ]
+)
+
+
+class SessionRecorder:
+    """
+    ### Appends per-frame landmarks and metrics to a fixed-record binary session log
+
+    Frames are collected into a preallocated batch and written with a single
+    `write` call every `batch_size` frames. Opening an existing log appends
+    to it. Read logs back with :class:`SessionLog`.
+
+    Args:
+    * path: session log file
+    * batch_size: frames buffered in memory between writes
+
+    Example:
+    `recorder = SessionRecorder("sessions/today.ppsess")`
+    `recorder.record(time.time(), landmarks, metrics, standing)`
+    `recorder.close()`
+    """
+
+    def __init__(self, path: str, batch_size: int = 256) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            _read_header(path)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, RECORD_DTYPE.itemsize))
+        self.batch = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        self.pending = 0
+        self.recorded = 0
+
+    def record(self, timestamp: float, landmarks, metrics, standing: bool) -> None:
+        """
+        ### Add one frame to the current batch, writing the batch when it is full
+
+        Args:
+        * timestamp: wall-clock time of the frame (time.time())
+        * landmarks: (33, 4) landmark array, or None if no pose was detected
+        * metrics: :class:`pose_utils.PostureMetrics`, or None
+        * standing: result of :func:`posture_boolean.is_standing`
+        """
+        row = self.batch[self.pending]
+        row["timestamp"] = timestamp
+        flags = FLAG_STANDING if standing else 0
+        if landmarks is not None:
+            row["landmarks"] = landmarks
+        else:
+            row["landmarks"] = 0
+        if metrics is not None:
+            row["metrics"] = metrics.to_record()
+            flags |= FLAG_DETECTED
+        else:
+            row["metrics"] = 0
+        row["flags"] = flags
+        self.pending += 1
+        self.recorded += 1
+        if self.pending == len(self.batch):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.file.write(self.batch[: self.pending].tobytes())
+            self.pending = 0
+        self.file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
+
+
+def _read_header(path: str) -> None:
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a posture session log")
+    magic, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a posture session log")
+    if record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(
+            f"{path} was recorded with {record_size} byte records, expected {RECORD_DTYPE.itemsize}"
+        )
+
+
+class SessionLog:
+    """
+    ### Memory-mapped, read-only view of a session log
+
+    Nothing is loaded into RAM up front; fields are numpy views backed by the
+    file, so days of frames can be analyzed or re-scored without replaying
+    video or re-running MediaPipe. A partially written trailing record is ignored.
+
+    Example:
+    `log = SessionLog("sessions/today.ppsess")`
+    `scores = log.rescore(PostureEvaluator(easiness=3))`
+    `print(log.summary(PostureEvaluator(easiness=3)))`
+    """
+
+    def __init__(self, path: str) -> None:
+        _read_header(path)
+        self.path = path
+        count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(
+                path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,)
+            )
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records["timestamp"]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self.records["landmarks"]
+
+    @property
+    def metrics(self) -> np.ndarray:
+        return self.records["metrics"]
+
+    @property
+    def detected(self) -> np.ndarray:
+        return (self.records["flags"] & FLAG_DETECTED) != 0
+
+    @property
+    def standing(self) -> np.ndarray:
+        return (self.records["flags"] & FLAG_STANDING) != 0
+
+    def chunks(self, chunk_size: int = 65536):
+        """Yields consecutive slices of the records so memory use stays bounded."""
+        for start in range(0, len(self.records), chunk_size):
+            yield self.records[start : start + chunk_size]
+
+    def rescore(
+        self, evaluator: PostureEvaluator, chunk_size: int = 65536
+    ) -> np.ndarray:
+        """
+        ### Score every recorded frame against the evaluator's baseline and easiness
+
+        Frames without a detected pose, or where the user was standing, are
+        scored as not good (all checks False).
+
+        Returns:
+        * a structured array of `posture_evaluator.SCORE_DTYPE`, one row per frame
+        """
+        scores = np.zeros(len(self.records), dtype=SCORE_DTYPE)
+        start = 0
+        for chunk in self.chunks(chunk_size):
+            end = start + len(chunk)
+            scored = (chunk["flags"] & FLAG_DETECTED != 0) & (
+                chunk["flags"] & FLAG_STANDING == 0
+            )
+            chunk_scores = evaluator.score_batch(chunk["metrics"])
+            for name in SCORE_DTYPE.names:
+                chunk_scores[name] &= scored
+            scores[start:end] = chunk_scores
+            start = end
+        return scores
+
+    def summary(self, evaluator: PostureEvaluator) -> dict:
+        """Good/bad/standing seconds, weighting each frame by the time until the next one."""
+        if not len(self.records):
+            return {
+                "frames": 0,
+                "good_seconds": 0.0,
+                "bad_seconds": 0.0,
+                "standing_seconds": 0.0,
+            }
+        scores = self.rescore(evaluator)
+        timestamps = self.timestamps
+        durations = np.diff(timestamps, append=timestamps[-1])
+        # gaps between recordings (e.g. the app was closed) do not count
+        durations[(durations < 0) | (durations > 5)] = 0
+        standing = self.standing
+        scored = self.detected & ~standing
+        return {
+            "frames": len(self.records),
+            "good_seconds": round(float(durations[scores["good"]].sum()), 3),
+            "bad_seconds": round(float(durations[scored & ~scores["good"]].sum()), 3),
+            "standing_seconds": round(float(durations[standing].sum()), 3),
+        }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-score a recorded posture session against a baseline"
+    )
+    parser.add_argument("path", help="session log recorded by SessionRecorder")
+    parser.add_argument("--easiness", type=int, default=5)
+    parser.add_argument(
+        "--baseline", help="JSON object of baseline values, e.g. '{\"closeness\": 400}'"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline) if args.baseline else None
+    log = SessionLog(args.path)
+    print(json.dumps(log.summary(PostureEvaluator(baseline, args.easiness))))
+
+
+if __name__ == "__main__":
+    main()
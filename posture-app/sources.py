@@ -0,0 +1,235 @@
+import math as m
+import os
+import random
+import time
+from types import SimpleNamespace
+from typing import Iterator, NamedTuple
+
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class SourceFrame(NamedTuple):
+    """
+    A single input frame.
+
+    `timestamp` is in seconds from the start of the source. `image` is a BGR
+    frame, or None for sources that produce landmarks directly, in which case
+    `pose_landmarks` is set and no pose inference is needed.
+    """
+
+    timestamp: float
+    image: cv2.Mat | None
+    pose_landmarks: object | None = None
+
+
+class WebcamSource:
+    """
+    ### Frames from a local camera
+
+    Example:
+    `for frame in WebcamSource(0): ...`
+    """
+
+    def __init__(
+        self, index: int = 0, width: int = 640, height: int = 480, fps: float = 10.0
+    ) -> None:
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if not self.cap.isOpened():
+            raise OSError(f"Unable to access camera {index}")
+
+    def __iter__(self) -> Iterator[SourceFrame]:
+        start = time.monotonic()
+        try:
+            while True:
+                success, image = self.cap.read()
+                if not success:
+                    return
+                yield SourceFrame(time.monotonic() - start, image)
+        finally:
+            self.cap.release()
+
+
+class VideoFileSource:
+    """
+    ### Frames from a recorded video file, timestamped with the file's own clock
+
+    Example:
+    `for frame in VideoFileSource("session.mp4"): ...`
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise OSError(f"Unable to open video file {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def __iter__(self) -> Iterator[SourceFrame]:
+        frame_index = 0
+        try:
+            while True:
+                success, image = self.cap.read()
+                if not success:
+                    return
+                msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+                timestamp = msec / 1000 if msec > 0 else frame_index / self.fps
+                frame_index += 1
+                yield SourceFrame(timestamp, image)
+        finally:
+            self.cap.release()
+
+
+class ImageDirSource:
+    """
+    ### Frames from a directory of images, read in sorted filename order
+
+    Example:
+    `for frame in ImageDirSource("frames/", fps=10): ...`
+    """
+
+    def __init__(self, path: str, fps: float = 10.0) -> None:
+        if not os.path.isdir(path):
+            raise OSError(f"{path} is not a directory")
+        self.fps = fps
+        self.files = sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise OSError(f"{path} contains no images")
+
+    def __iter__(self) -> Iterator[SourceFrame]:
+        for i, file in enumerate(self.files):
+            image = cv2.imread(file)
+            if image is None:
+                continue
+            yield SourceFrame(i / self.fps, image)
+
+
+class SyntheticSource:
+    """
+    ### Generates plausible seated/slouching/standing landmarks without a camera or model
+
+    Produces objects shaped like mediapipe's `results.pose_landmarks` so the
+    rest of the posture logic runs unchanged. The user sits upright, slouches
+    for `slouch_seconds` every `cycle_seconds`, and stands up for
+    `stand_seconds` at the end of each cycle.
+
+    Args:
+    * frames: number of frames to generate, None for an endless stream
+    * fps: nominal frame rate used for timestamps
+    * width, height: frame size the landmarks are normalized against
+    * seed: random seed for the jitter, for reproducible runs
+
+    Example:
+    `for frame in SyntheticSource(frames=600, fps=10): ...`
+    """
+
+    LANDMARK_COUNT = 33
+
+    def __init__(
+        self,
+        frames: int | None = 600,
+        fps: float = 10.0,
+        width: int = 640,
+        height: int = 480,
+        cycle_seconds: float = 60.0,
+        slouch_seconds: float = 15.0,
+        stand_seconds: float = 5.0,
+        jitter: float = 0.002,
+        seed: int | None = 0,
+    ) -> None:
+        self.frames = frames
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.cycle_seconds = cycle_seconds
+        self.slouch_seconds = slouch_seconds
+        self.stand_seconds = stand_seconds
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    def _pose(self, timestamp: float) -> dict[int, tuple[float, float, float]]:
+        """Normalized (x, y, z) of the landmarks the posture logic uses at `timestamp`."""
+        phase = timestamp % self.cycle_seconds
+        standing = phase >= self.cycle_seconds - self.stand_seconds
+        slouching = (
+            not standing
+            and phase >= self.cycle_seconds - self.stand_seconds - self.slouch_seconds
+        )
+
+        # neck inclination in pose_utils._findAngle units, upright sits inside the default band
+        neck_angle = 45 if slouching else 25
+        closeness = 0.75 if slouching else 0.66
+        shoulder_y = 0.35 if standing else 0.6
+        eye_y = 0.3 if standing else 0.35
+
+        neck_length = 0.2 * self.height
+        theta = neck_angle / int(180 / m.pi)
+        l_shldr = (0.62, shoulder_y)
+        l_ear = (
+            l_shldr[0] + neck_length * m.sin(theta) / self.width,
+            l_shldr[1] - neck_length * m.cos(theta) / self.height,
+        )
+        return {
+            2: (0.52, eye_y, -closeness),  # LEFT_EYE
+            5: (0.48, eye_y, -closeness),  # RIGHT_EYE
+            7: (*l_ear, -closeness),  # LEFT_EAR
+            11: (*l_shldr, -closeness),  # LEFT_SHOULDER
+            12: (0.38, shoulder_y, -closeness),  # RIGHT_SHOULDER
+            23: (0.63, shoulder_y + 0.35, -closeness / 2),  # LEFT_HIP
+        }
+
+    def _landmarks(self, timestamp: float) -> SimpleNamespace:
+        points = self._pose(timestamp)
+        landmark = []
+        for i in range(self.LANDMARK_COUNT):
+            x, y, z = points.get(i, (0.5, 0.5, 0.0))
+            landmark.append(
+                SimpleNamespace(
+                    x=x + self.random.gauss(0, self.jitter),
+                    y=y + self.random.gauss(0, self.jitter),
+                    z=z + self.random.gauss(0, self.jitter),
+                    visibility=1.0 if i in points else 0.5,
+                )
+            )
+        return SimpleNamespace(landmark=landmark)
+
+    def __iter__(self) -> Iterator[SourceFrame]:
+        i = 0
+        while self.frames is None or i < self.frames:
+            timestamp = i / self.fps
+            yield SourceFrame(timestamp, None, self._landmarks(timestamp))
+            i += 1
+
+
+def open_source(
+    kind: str, target: str | None = None, fps: float = 10.0, frames: int | None = None
+):
+    """
+    ### Build a frame source by name
+
+    Args:
+    * kind: "webcam", "video", "images" or "synthetic"
+    * target: camera index, video path or image directory (unused for "synthetic")
+    * fps: nominal frame rate for camera, image directory and synthetic sources
+    * frames: number of synthetic frames, None for endless
+
+    Example:
+    `source = open_source("video", "session.mp4")`
+    """
+    if kind == "webcam":
+        return WebcamSource(int(target or 0), fps=fps)
+    if kind == "video":
+        return VideoFileSource(target)
+    if kind == "images":
+        return ImageDirSource(target, fps=fps)
+    if kind == "synthetic":
+        return SyntheticSource(frames=frames, fps=fps)
+    raise ValueError(f"Unknown source {kind!r}")
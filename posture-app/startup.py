@@ -0,0 +1,116 @@
+import sys
+import threading
+import time
+
+# imported first by main.py, so this is as close to process start as Python code gets
+STARTED_AT = time.perf_counter()
+
+
+class StartupProfiler:
+    """
+    ### Records how long each startup phase took, up to the first processed frame
+
+    Phases can be marked from any thread (the warm-up runs in the background),
+    the report lists them in the order they finished.
+
+    Example:
+    `profiler = StartupProfiler()`
+    `profiler.mark("window")`
+    `print(profiler.report())`
+    """
+
+    def __init__(self, started_at: float = STARTED_AT) -> None:
+        self.started_at = started_at
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str, since: float | None = None) -> float:
+        """
+        ### Record that `phase` finished now
+
+        Args:
+        * phase: name shown in the report
+        * since: perf_counter() time the phase started, defaults to the app start
+
+        Returns:
+        * seconds since the app started
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append(
+                (phase, now - (self.started_at if since is None else since), now)
+            )
+        return now - self.started_at
+
+    def elapsed(self, phase: str) -> float | None:
+        """Seconds from app start until `phase` finished, None if it has not."""
+        for name, _, finished_at in self.phases:
+            if name == phase:
+                return finished_at - self.started_at
+        return None
+
+    def report(self) -> str:
+        lines = ["startup phase          took     at"]
+        for phase, took, finished_at in self.phases:
+            lines.append(
+                f"{phase:<20} {took * 1000:>7.0f}ms {(finished_at - self.started_at) * 1000:>6.0f}ms"
+            )
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        print(self.report(), file=sys.stderr)
+
+
+class Warmup:
+    """
+    ### Runs slow initialization (model load, camera open) on background threads
+
+    Each task gets its own thread so they overlap, and is marked on the
+    profiler when it finishes. The GUI stays responsive and polls :attr:`done`.
+
+    Example:
+    `warmup = Warmup(profiler, pose=create_pose, camera=open_camera)`
+    `warmup.start()`
+    `if warmup.done and not warmup.error: pose = warmup.results["pose"]`
+    """
+
+    def __init__(self, profiler: StartupProfiler, **tasks) -> None:
+        self.profiler = profiler
+        self.tasks = tasks
+        self.results = {}
+        self.error = None
+        self._threads = []
+
+    def start(self) -> None:
+        for name, task in self.tasks.items():
+            thread = threading.Thread(
+                target=self._run, args=(name, task), name=f"warmup-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self, name: str, task) -> None:
+        started = time.perf_counter()
+        try:
+            self.results[name] = task()
+        except Exception as e:
+            self.error = e
+        self.profiler.mark(name, since=started)
+
+    @property
+    def done(self) -> bool:
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def close(self, **closers) -> None:
+        """
+        ### Wait for the tasks and close the results that will not be used
+
+        Args:
+        * closers: task name -> function called with that task's result, e.g.
+          `camera=lambda cap: cap.release()`
+        """
+        for thread in self._threads:
+            thread.join()
+        for name, close in closers.items():
+            if name in self.results:
+                close(self.results.pop(name))
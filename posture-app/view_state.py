@@ -0,0 +1,106 @@
+import time
+
+
+class ViewState:
+    """
+    ### Diffs the desired widget values against what is on screen
+
+    The GUI loop sets every widget's value each iteration; :meth:`render`
+    only calls `window[key].update()` for values that differ from the last
+    rendered one, and at most once per `min_interval` seconds per widget, so
+    fast changing text (latency, fps) refreshes at a readable rate instead of
+    every frame. Tk widget updates are far more expensive than the comparison.
+
+    `view[key].update(value)` is accepted too, so code written against a
+    window (e.g. :class:`gui_functions.Timer`) can be handed the view instead.
+    Updates with other arguments (images, visibility) go straight to the window.
+
+    Args:
+    * window: the PySimpleGUI window
+    * min_interval: minimum seconds between two updates of the same widget
+    * intervals: per-key overrides of `min_interval`, 0 renders changes immediately
+    * clock: monotonic time source, injectable for tests
+
+    Example:
+    `view = ViewState(window, intervals={"-AUTO-STANDING-TEXT": 0})`
+    `view.set("-FPS-DEBUG-", f"{fps:.1f}")`
+    `view.render()`
+    """
+
+    def __init__(
+        self,
+        window,
+        min_interval: float = 0.25,
+        intervals: dict[str, float] | None = None,
+        clock=time.monotonic,
+    ) -> None:
+        self.window = window
+        self.min_interval = min_interval
+        self.intervals = intervals or {}
+        self.clock = clock
+        self.rendered = {}
+        self.pending = {}
+        self.updates = 0
+        self.skipped = 0
+        self._rendered_at = {}
+
+    def set(self, key: str, value) -> None:
+        """Set the value a widget should show on the next :meth:`render`."""
+        if self.rendered.get(key, _UNSET) == value:
+            self.pending.pop(key, None)
+            self.skipped += 1
+        else:
+            self.pending[key] = value
+
+    def render(self) -> int:
+        """
+        ### Push the changed values that are due to the window
+
+        Returns:
+        * the number of widgets updated
+        """
+        if not self.pending:
+            return 0
+        now = self.clock()
+        updated = 0
+        for key in list(self.pending):
+            interval = self.intervals.get(key, self.min_interval)
+            if now - self._rendered_at.get(key, -interval) < interval:
+                continue
+            value = self.pending.pop(key)
+            self.window[key].update(value)
+            self.rendered[key] = value
+            self._rendered_at[key] = now
+            updated += 1
+        self.updates += updated
+        return updated
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Forget what was rendered, e.g. after updating a widget directly."""
+        if key is None:
+            self.rendered.clear()
+        else:
+            self.rendered.pop(key, None)
+
+    def __getitem__(self, key: str) -> "_ElementProxy":
+        return _ElementProxy(self, key)
+
+
+class _ElementProxy:
+    """Stands in for `window[key]` so `.update(value)` goes through the view."""
+
+    __slots__ = ("view", "key")
+
+    def __init__(self, view: ViewState, key: str) -> None:
+        self.view = view
+        self.key = key
+
+    def update(self, value=None, **kwargs) -> None:
+        if kwargs:
+            self.view.window[self.key].update(value, **kwargs)
+            self.view.invalidate(self.key)
+        else:
+            self.view.set(self.key, value)
+
+
+_UNSET = object()